@@ -0,0 +1,72 @@
+"""Measure bulk import throughput for a large bank CSV export.
+
+Writes a synthetic card-history CSV (negative amounts are spending, a few
+payments and refunds mixed in), imports it into a throwaway store, then
+imports it again to time the all-duplicates path:
+
+    python benchmarks/bulk_import.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsight.importer import CHUNK_SIZE, import_transactions  # noqa: E402
+from finsight.storage import TransactionStore  # noqa: E402
+
+MERCHANTS = [
+    "WHOLE FOODS MARKET", "TRADER JOE'S", "STARBUCKS", "NETFLIX.COM", "SPOTIFY USA", "SHELL OIL",
+    "AMAZON MKTPLACE", "TARGET", "COSTCO WHSE", "CVS PHARMACY", "UBER EATS", "CHIPOTLE", "HOME DEPOT",
+    "DUNKIN", "WALGREENS", "SAFEWAY", "APPLE.COM/BILL", "PRIME VIDEO", "7-ELEVEN", "KROGER",
+]
+
+
+def write_csv(path, rows, seed_value=0):
+    rng = random.Random(seed_value)
+    start = date.today() - timedelta(days=10 * 365)
+    with open(path, "w") as f:
+        f.write("Transaction Date,Description,Amount,Card No.\n")
+        for i in range(rows):
+            day = start + timedelta(days=i * 3650 // rows)
+            if rng.random() < 0.03:
+                f.write(f"{day:%m/%d/%Y},PAYMENT THANK YOU,{rng.uniform(100, 2000):.2f},1234\n")
+                continue
+            store = rng.randrange(1, 3000)
+            f.write(f"{day:%m/%d/%Y},{rng.choice(MERCHANTS)} #{store},-{rng.uniform(1, 250):.2f},1234\n")
+
+
+def timed_import(store, path, chunksize, label):
+    with open(path, "rb") as f:
+        report = import_transactions(store, f, path, "benchmark", chunksize=chunksize)
+    print(f"{label}: {report.rows:,} rows in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s);"
+          f" {report.imported:,} imported, {report.duplicates:,} duplicates, {report.skipped:,} not spending,"
+          f" {report.unreadable:,} unreadable")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "history.csv")
+        began = time.perf_counter()
+        write_csv(path, args.rows)
+        print(f"wrote {os.path.getsize(path) / 1e6:.0f} MB CSV in {time.perf_counter() - began:.1f}s")
+        store = TransactionStore(os.path.join(data_dir, "finsight.db"))
+        timed_import(store, path, args.chunksize, "first import")
+        timed_import(store, path, args.chunksize, "re-import")
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"peak memory {peak:.0f} MB with {args.chunksize:,}-row chunks;"
+              f" database {os.path.getsize(os.path.join(data_dir, 'finsight.db')) / 1e6:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare dashboard chart payload size and render time by history size.
+
+For each row count, seeds a throwaway store with synthetic transactions
+spread over three years and times, per chart, aggregation plus building
+the figure plus serializing it to the JSON Streamlit sends the browser:
+
+- "raw pie": the old px.pie over every transaction row;
+- the new charts from finsight.charts, built from the daily rollups.
+
+    python benchmarks/charts.py --rows 10000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsight.charts import (  # noqa: E402
+    by_category, category_pie, daily_frame, over_time, spend_over_time_chart, want_need_chart,
+)
+from finsight.storage import TransactionStore  # noqa: E402
+from finsight.synthetic import seed_store  # noqa: E402
+
+
+def measure(label, build):
+    began = time.perf_counter()
+    payload = build().to_json()
+    elapsed = time.perf_counter() - began
+    print(f"  {label:<22} {len(payload) / 1024:>9,.0f} KB {elapsed * 1000:>9,.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    # Plotly's first figure pays for its imports and templates; keep that out of the numbers
+    category_pie(pd.DataFrame({"Category": ["Other"], "Price": [1.0]})).to_json()
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = TransactionStore(os.path.join(data_dir, "finsight.db"))
+            seed_store(store, rows)
+            transactions = store.query()
+            print(f"{rows:,} transactions")
+            print(f"  {'chart':<22} {'payload':>12} {'time':>12}")
+
+            def raw_pie():
+                import plotly.express as px
+                return px.pie(transactions, values="Price", names="Category", title="Spending by Category")
+
+            measure("raw pie (before)", raw_pie)
+            daily = daily_frame(store.daily_totals())
+            measure("category pie", lambda: category_pie(by_category(daily)))
+            for frequency in ["Day", "Week", "Month"]:
+                measure(f"spend per {frequency.lower()}",
+                        lambda: spend_over_time_chart(over_time(daily, "Category", frequency), frequency))
+            measure("wants vs needs/month", lambda: want_need_chart(over_time(daily, "Want or Need"), "Month"))
+
+
+if __name__ == "__main__":
+    main()
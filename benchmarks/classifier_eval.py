@@ -0,0 +1,146 @@
+"""Offline precision and latency of the local item classifier.
+
+Trains an ItemClassifier on part of a labelled set and scores items it has
+never seen, reporting how many clear each confidence threshold (and so
+would skip Gemini), how often those are right (precision), the keyword
+baseline, per-item latency, and the same numbers for growing training sets
+so MIN_EXAMPLES can be checked too.
+
+Held-out items must not share a product with the training set, or the
+score only shows that the classifier memorized it. With
+finsight.synthetic's vocabulary, whole products are held out per
+category, and held-out names of trained products are scored separately
+as the repeat-purchase case. With a category cache, names that differ
+only by digits (SKUs, sizes, prices) are held out together:
+
+    python benchmarks/classifier_eval.py --cache .finsight/categories.db
+    python benchmarks/classifier_eval.py --synthetic 5000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsight.cache import CategoryCache, normalize_name  # noqa: E402
+from finsight.categorize import categorize_by_keywords  # noqa: E402
+from finsight.classifier import MIN_CONFIDENCE, MIN_EXAMPLES, USER_WEIGHT, ItemClassifier  # noqa: E402
+from finsight.synthetic import PRODUCTS, labelled_items  # noqa: E402
+
+THRESHOLDS = sorted({0.5, 0.7, 0.8, 0.9, 0.95, MIN_CONFIDENCE, 0.99})
+_DIGITS = re.compile(r"\d+")
+
+
+def train(rows):
+    classifier = ItemClassifier()
+    classifier.learn((name, category, want_need) for name, category, want_need, source in rows if source != "user")
+    classifier.learn(((name, category, want_need) for name, category, want_need, source in rows if source == "user"),
+                     weight=USER_WEIGHT)
+    return classifier
+
+
+def at_threshold(guesses, test, threshold):
+    """(share of items that skip Gemini, precision of those, number of them)"""
+    confident = [(guess, row) for guess, row in zip(guesses, test) if guess[2] >= threshold]
+    if not confident:
+        return 0.0, 0.0, 0
+    right = sum(guess[:2] == row[1:3] for guess, row in confident)
+    return len(confident) / len(test), right / len(confident), len(confident)
+
+
+def evaluate(train_rows, tests):
+    """Print coverage and precision per threshold for each named test set in ``tests``"""
+    began = time.perf_counter()
+    classifier = train(train_rows)
+    train_seconds = time.perf_counter() - began
+    print(f"trained on {len(train_rows)} items in {train_seconds:.2f}s")
+
+    for label, test in tests.items():
+        began = time.perf_counter()
+        guesses = classifier.predict_many(name for name, _, _, _ in test)
+        predict_seconds = time.perf_counter() - began
+        keyword = sum(categorize_by_keywords(name) == category for name, category, _, _ in test) / len(test)
+        category_hits = sum(guess[0] == row[1] for guess, row in zip(guesses, test)) / len(test)
+        both_hits = sum(guess[:2] == row[1:3] for guess, row in zip(guesses, test)) / len(test)
+        print(f"\n{label}: {len(test)} items, {predict_seconds / len(test) * 1e6:.0f} µs/item")
+        print(f"  category accuracy: keywords {keyword:.1%}, classifier {category_hits:.1%}"
+              f" (category and want/need both right: {both_hits:.1%})")
+        print("  threshold  skip Gemini  precision when skipped")
+        for threshold in THRESHOLDS:
+            coverage, precision, count = at_threshold(guesses, test, threshold)
+            marker = "  <- MIN_CONFIDENCE" if threshold == MIN_CONFIDENCE else ""
+            print(f"  {threshold:9.2f}  {coverage:11.1%}  {precision:22.1%}{marker}"
+                  f"{'' if count else '  (none)'}")
+
+
+def learning_curve(train_rows, test, sizes):
+    """Coverage and precision at MIN_CONFIDENCE after training on the first ``size`` rows"""
+    print(f"\ntraining items  skip Gemini  precision at {MIN_CONFIDENCE:.2f}")
+    for size in sizes:
+        if size > len(train_rows):
+            continue
+        classifier = train(train_rows[:size])
+        guesses = classifier.predict_many(name for name, _, _, _ in test)
+        coverage, precision, _ = at_threshold(guesses, test, MIN_CONFIDENCE)
+        marker = "  <- MIN_EXAMPLES" if size == MIN_EXAMPLES else ""
+        print(f"{size:14}  {coverage:11.1%}  {precision:16.1%}{marker}")
+
+
+def split_products(fraction, rng):
+    """(trained, held out) copies of PRODUCTS, holding out ``fraction`` of each label's products"""
+    trained, held_out = {}, {}
+    for label, products in PRODUCTS.items():
+        products = list(products)
+        rng.shuffle(products)
+        cut = max(1, round(len(products) * fraction))
+        held_out[label], trained[label] = products[:cut], products[cut:]
+    return trained, held_out
+
+
+def synthetic_split(count, fraction, seed):
+    trained, held_out = split_products(fraction, random.Random(seed))
+    rows = [(*row, "model") for row in labelled_items(count, seed, trained)]
+    test_count = max(10, int(count * fraction))
+    names = {row[0] for row in rows}
+    repeat = [(*row, "model") for row in labelled_items(test_count * 2, seed + 1, trained) if row[0] not in names]
+    unseen = [(*row, "model") for row in labelled_items(test_count, seed + 2, held_out)]
+    return rows, {"unseen products": unseen, "new names of trained products": repeat[:test_count]}
+
+
+def cache_split(rows, fraction, seed):
+    def group(name):
+        return _DIGITS.sub("", normalize_name(name)).strip()
+
+    groups = sorted({group(row[0]) for row in rows})
+    random.Random(seed).shuffle(groups)
+    held_out = set(groups[:int(len(groups) * fraction)])
+    train_rows = [row for row in rows if group(row[0]) not in held_out]
+    return train_rows, {"unseen names": [row for row in rows if group(row[0]) in held_out]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cache", help="categories.db to take labelled names from")
+    parser.add_argument("--synthetic", type=int, default=5000, help="synthetic items when no cache is given")
+    parser.add_argument("--test-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.cache:
+        rows = CategoryCache(args.cache).labelled()
+        if len(rows) < 10:
+            raise SystemExit(f"Only {len(rows)} labelled items; need at least 10")
+        train_rows, tests = cache_split(rows, args.test_fraction, args.seed)
+    else:
+        train_rows, tests = synthetic_split(args.synthetic, args.test_fraction, args.seed)
+    random.Random(args.seed).shuffle(train_rows)
+    evaluate(train_rows, tests)
+    sizes = sorted({50, MIN_EXAMPLES, 500, 1000, len(train_rows)})
+    learning_curve(train_rows, next(iter(tests.values())), sizes)
+
+
+if __name__ == "__main__":
+    main()
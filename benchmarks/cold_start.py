@@ -0,0 +1,82 @@
+"""Measure cold-start cost of each page in a fresh interpreter.
+
+Reports how long the shared FinSight modules take to import, then for
+every page the first render time, the number of modules it loaded and
+which heavy provider/charting libraries it pulled in (the test harness
+itself already imports plotly and PIL):
+
+    python benchmarks/cold_start.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["app.py", "pages/upload_receipt.py", "pages/ai_insights.py"]
+HEAVY = ["plotly", "mindee", "google.generativeai", "PIL"]
+
+_PROBE = """
+import json, sys, time
+began = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness = time.perf_counter() - began
+before = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=120)
+if {page!r} != "app.py":
+    at.switch_page({page!r})
+began = time.perf_counter()
+at.run()
+render = time.perf_counter() - began
+loaded = set(sys.modules) - before
+print(json.dumps({{
+    "harness_s": harness,
+    "first_render_s": render,
+    "modules": len(loaded),
+    "heavy": [name for name in {heavy!r} if name in loaded],
+    "exception": [e.message for e in at.exception],
+}}))
+"""
+
+
+_IMPORT_PROBE = """
+import json, time
+import streamlit
+began = time.perf_counter()
+import finsight.resources, finsight.ui
+print(json.dumps({"import_s": time.perf_counter() - began}))
+"""
+
+
+def run(code):
+    env = dict(os.environ, FINSIGHT_DATA_DIR=tempfile.mkdtemp(prefix="finsight-cold-"), PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def probe(page):
+    return run(_PROBE.format(app=os.path.join(ROOT, "app.py"), page=page, heavy=HEAVY))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(ROOT, "finsight", "ui.py")):
+        best = min(run(_IMPORT_PROBE)["import_s"] for _ in range(args.repeat))
+        print(f"finsight.resources + finsight.ui import: {best * 1000:.0f}ms")
+    for page in PAGES:
+        runs = [probe(page) for _ in range(args.repeat)]
+        best = min(runs, key=lambda run: run["first_render_s"])
+        if best["exception"]:
+            print(f"{page}: raised {best['exception'][0]}")
+        print(f"{page}: first render {best['first_render_s'] * 1000:.0f}ms,"
+              f" {best['modules']} modules loaded, heavy imports: {', '.join(best['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
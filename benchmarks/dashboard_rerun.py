@@ -0,0 +1,60 @@
+"""Measure dashboard rerun latency when toggling the filter pills.
+
+Seeds a throwaway data directory with synthetic transactions and drives
+app.py through Streamlit's AppTest:
+
+    python benchmarks/dashboard_rerun.py --rows 100000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["FINSIGHT_DATA_DIR"] = tempfile.mkdtemp(prefix="finsight-bench-")
+    sys.path.insert(0, ROOT)
+    from streamlit.testing.v1 import AppTest
+    from finsight.config import data_path
+    from finsight.storage import TransactionStore
+    from finsight.synthetic import seed_store
+
+    seed_store(TransactionStore(data_path("finsight.db")), args.rows)
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600)
+    began = time.perf_counter()
+    at.run()
+    print(f"first render: {(time.perf_counter() - began) * 1000:.0f}ms for {args.rows} rows")
+
+    selections = [
+        (["Want"], ["Groceries", "Snacks"]),
+        (["Want", "Need"], ["Household"]),
+        (["Need"], []),
+        (["Want", "Need"], ["Groceries", "Snacks", "Household", "Subscriptions", "Other"]),
+    ]
+    timings = []
+    for _ in range(args.repeat):
+        for want_need, categories in selections:
+            at.session_state["want_need_filter"] = want_need
+            at.session_state["category_filter"] = categories
+            began = time.perf_counter()
+            at.run()
+            timings.append(time.perf_counter() - began)
+    if at.exception:
+        raise SystemExit(at.exception[0].message)
+    timings.sort()
+    print(f"filter rerun: median {statistics.median(timings) * 1000:.0f}ms,"
+          f" max {timings[-1] * 1000:.0f}ms over {len(timings)} reruns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Drive simulated sessions against one in-process FinSight server, with their reruns taking turns.
+
+Each session is a Streamlit AppTest on its own thread. Per iteration it
+flips the dashboard filters on app.py, uploads a receipt on
+pages/upload_receipt.py and waits for it to be processed, then opens
+pages/ai_insights.py. Sessions share the process-wide store, caches, job
+queue and provider clients, as sessions on one server do.
+
+Mindee and Gemini are the fake providers (FINSIGHT_PROVIDERS=fake) with
+the given latency and error rate, replaying a recorded cassette with
+--cassette. Provider quotas stay at their configured values unless
+--gemini-rpm/--mindee-rpm raise them.
+
+AppTest cannot drive a file uploader, so a simulated upload does what the
+page does with an uploaded image: submits it to the job queue, records
+the job in the session's upload_jobs, then reruns the page once a second
+(as the polling fragment would) until the job is finished.
+
+AppTest swaps process-wide Streamlit state (the runtime instance, the
+page registry) on every run, so script runs of different sessions are
+serialized; only receipt jobs and provider calls run concurrently. This
+is not a measure of how many users one server handles: reruns never
+contend with each other for the store, the caches or the GIL. Rerun
+latency includes the wait for a turn, and "script" is the time spent
+running the page itself.
+
+Reports p50/p99 rerun latency per page, receipt turnaround, memory per
+session and provider call counts:
+
+    python benchmarks/load_test.py --sessions 10 --rows 100000 --iterations 2
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {"app.py": "dashboard", "pages/upload_receipt.py": "upload", "pages/ai_insights.py": "insights"}
+SELECTIONS = [
+    (["Want"], ["Groceries", "Snacks"]),
+    (["Want", "Need"], ["Household"]),
+    (["Need"], []),
+]
+POLL_INTERVAL = 1.0
+
+# Held for each AppTest run; see the module docstring
+_run_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Resident memory of this process (peak resident memory where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def receipt_image(label):
+    """A small JPEG with ``label`` written on it, so every simulated receipt is a distinct image"""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (600, 900), 255)
+    ImageDraw.Draw(image).text((40, 40), label, fill=0)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class Session:
+    """One simulated user, recording (page, seconds, script seconds) for every rerun"""
+
+    def __init__(self, number, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.number = number
+        self.at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+        self.page = "app.py"
+        self.reruns = []
+        self.receipts = []
+        self.error = None
+
+    def run(self):
+        began = time.perf_counter()
+        with _run_lock:
+            started = time.perf_counter()
+            self.at.run()
+            finished = time.perf_counter()
+        self.reruns.append((PAGES[self.page], finished - began, finished - started))
+        if self.at.exception:
+            raise RuntimeError(f"{self.page}: {self.at.exception[0].message}")
+
+    def open(self, page):
+        self.page = page
+        self.at.switch_page(page)
+        self.run()
+
+    def upload(self, label, timeout):
+        from finsight.jobs import ACTIVE
+        from finsight.resources import get_job_queue
+
+        queue = get_job_queue()
+        began = time.perf_counter()
+        job_id = queue.submit(receipt_image(label), f"{label}.jpg")
+        jobs = dict(self.at.session_state["upload_jobs"])
+        jobs[job_id] = f"{label}.jpg"
+        self.at.session_state["upload_jobs"] = jobs
+        self.run()
+        while queue.jobs([job_id])[job_id].status in ACTIVE:
+            if time.perf_counter() - began > timeout:
+                raise TimeoutError(f"{label} still processing after {timeout:.0f}s")
+            time.sleep(POLL_INTERVAL)
+            self.run()
+        self.receipts.append(time.perf_counter() - began)
+
+    def scenario(self, iterations, timeout):
+        try:
+            self.open("app.py")
+            for iteration in range(iterations):
+                for want_need, categories in SELECTIONS:
+                    self.at.session_state["want_need_filter"] = want_need
+                    self.at.session_state["category_filter"] = categories
+                    self.run()
+                self.open("pages/upload_receipt.py")
+                self.upload(f"session {self.number} receipt {iteration}", timeout)
+                self.open("pages/ai_insights.py")
+                self.open("app.py")
+        except Exception as e:
+            self.error = e
+
+
+def run_sessions(count, iterations, timeout, first=0):
+    sessions = [Session(first + i, timeout) for i in range(count)]
+    threads = [threading.Thread(target=session.scenario, args=(iterations, timeout), name=f"session-{i}")
+               for i, session in enumerate(sessions)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sessions, time.perf_counter() - began
+
+
+def provider_calls():
+    from finsight import tracing
+    from finsight.resources import get_gemini_model, get_mindee_client
+
+    gemini, mindee = get_gemini_model(), get_mindee_client()
+    counters = tracing.snapshot()["counters"]
+    return {
+        "gemini_calls": gemini.model.calls,
+        "gemini_errors": gemini.model.errors,
+        "gemini_merged": gemini.merged,
+        "gemini_replayed": gemini.model.replayed,
+        "mindee_calls": mindee.client.calls,
+        "mindee_errors": mindee.client.errors,
+        "mindee_merged": mindee.merged,
+        "retries": counters.get("provider.retries", 0),
+        "throttled_seconds": counters.get("provider.throttled_seconds", 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=2, help="scenario repeats per session")
+    parser.add_argument("--rows", type=int, default=10_000, help="synthetic transactions stored up front")
+    parser.add_argument("--ocr-latency", type=float, default=1.5)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of provider calls that fail")
+    parser.add_argument("--cassette", help="replay provider answers recorded with FINSIGHT_PROVIDERS=record")
+    parser.add_argument("--gemini-rpm", type=float, help="override the Gemini quota (FINSIGHT_GEMINI_RPM)")
+    parser.add_argument("--mindee-rpm", type=float, help="override the Mindee quota (FINSIGHT_MINDEE_RPM)")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per rerun or receipt")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    # Settings are read when finsight is first imported, so set them before that
+    os.environ.update({
+        "FINSIGHT_DATA_DIR": tempfile.mkdtemp(prefix="finsight-load-"),
+        "FINSIGHT_PROVIDERS": "fake",
+        "FINSIGHT_FAKE_OCR_LATENCY": str(args.ocr_latency),
+        "FINSIGHT_FAKE_LLM_LATENCY": str(args.llm_latency),
+        "FINSIGHT_FAKE_ERROR_RATE": str(args.error_rate),
+        "FINSIGHT_TRACE": "1",
+    })
+    if args.cassette:
+        os.environ["FINSIGHT_CASSETTE"] = os.path.abspath(args.cassette)
+    if args.gemini_rpm:
+        os.environ["FINSIGHT_GEMINI_RPM"] = str(args.gemini_rpm)
+    if args.mindee_rpm:
+        os.environ["FINSIGHT_MINDEE_RPM"] = str(args.mindee_rpm)
+    sys.path.insert(0, ROOT)
+    from finsight.config import GEMINI_RPM, MINDEE_RPM, data_path
+    from finsight.storage import TransactionStore
+    from finsight.synthetic import seed_store
+
+    seed_store(TransactionStore(data_path("finsight.db")), args.rows)
+
+    # One session first, so imports and the process-wide caches are not charged to the others
+    warm, seconds = run_sessions(1, 1, args.timeout, first=-1)
+    if warm[0].error:
+        raise SystemExit(f"Warm-up session failed: {warm[0].error!r}")
+    print(f"warm-up session: {seconds:.1f}s")
+    calls_before = provider_calls()
+
+    gc.collect()
+    memory_before = rss_bytes()
+    sessions, seconds = run_sessions(args.sessions, args.iterations, args.timeout)
+    gc.collect()
+    memory_per_session = (rss_bytes() - memory_before) / args.sessions
+    calls = {name: round(value - calls_before[name], 1) for name, value in provider_calls().items()}
+
+    failed = [session for session in sessions if session.error]
+    reruns = [rerun for session in sessions for rerun in session.reruns]
+    receipts = [receipt for session in sessions for receipt in session.receipts]
+    report = {
+        "sessions": args.sessions,
+        "iterations": args.iterations,
+        "rows": args.rows,
+        "ocr_latency": args.ocr_latency,
+        "llm_latency": args.llm_latency,
+        "error_rate": args.error_rate,
+        "gemini_rpm": GEMINI_RPM,
+        "mindee_rpm": MINDEE_RPM,
+        "seconds": round(seconds, 2),
+        "reruns_serialized": True,
+        "failed_sessions": len(failed),
+        "memory_per_session_mb": round(memory_per_session / 2 ** 20, 1),
+        "reruns": {},
+        "receipt_seconds": {},
+        "provider_calls": calls,
+    }
+    for label in ["all", *PAGES.values()]:
+        timings = [(seconds, script) for page, seconds, script in reruns if label in ("all", page)]
+        if timings:
+            total, script = zip(*timings)
+            report["reruns"][label] = {
+                "count": len(timings),
+                "p50_ms": round(percentile(total, 0.5) * 1000),
+                "p99_ms": round(percentile(total, 0.99) * 1000),
+                "script_p50_ms": round(percentile(script, 0.5) * 1000),
+                "script_p99_ms": round(percentile(script, 0.99) * 1000),
+            }
+    if receipts:
+        report["receipt_seconds"] = {"count": len(receipts), "p50": round(percentile(receipts, 0.5), 2),
+                                     "p99": round(percentile(receipts, 0.99), 2)}
+
+    print(f"{args.sessions} sessions x {args.iterations} iterations over {args.rows:,} rows"
+          f" in {seconds:.1f}s ({len(failed)} failed)")
+    print("  reruns ran one at a time; only receipt jobs and provider calls overlapped")
+    print(f"  {'page':<10} {'reruns':>7} {'p50':>9} {'p99':>9} {'script p50':>11} {'script p99':>11}")
+    for label, stats in report["reruns"].items():
+        print(f"  {label:<10} {stats['count']:>7} {stats['p50_ms']:>7}ms {stats['p99_ms']:>7}ms"
+              f" {stats['script_p50_ms']:>9}ms {stats['script_p99_ms']:>9}ms")
+    if receipts:
+        print(f"  receipt turnaround: p50 {report['receipt_seconds']['p50']:.1f}s,"
+              f" p99 {report['receipt_seconds']['p99']:.1f}s over {len(receipts)} receipts")
+    print(f"  memory per session: {report['memory_per_session_mb']:.1f} MB")
+    print("  provider calls: " + ", ".join(f"{name} {value}" for name, value in calls.items()))
+    for session in failed[:3]:
+        print(f"  session {session.number} failed: {session.error!r}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare serial and concurrent receipt processing against fake providers.
+
+Runs a batch of distinct receipt images through ReceiptPipeline with
+FakeMindee and FakeModel standing in for the real services:
+
+    python benchmarks/pipeline.py --receipts 20 --ocr-latency 1.5 --llm-latency 1.0
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from finsight.fakes import FakeMindee, FakeModel  # noqa: E402
+from finsight.pipeline import ReceiptPipeline  # noqa: E402
+
+
+def run(receipts, ocr_latency, llm_latency, **limits):
+    mindee, model = FakeMindee(latency=ocr_latency), FakeModel(latency=llm_latency)
+    pipeline = ReceiptPipeline(mindee, model, **limits)
+    uploads = [(f"receipt {i}".encode(), f"receipt_{i}.jpg") for i in range(receipts)]
+    began = time.perf_counter()
+    results = [event.result for event in pipeline.process_many(uploads) if event.result]
+    elapsed = time.perf_counter() - began
+    failed = [result.error for result in results if result.error]
+    if failed:
+        raise SystemExit(failed[0])
+    return elapsed, mindee.calls, model.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--receipts", type=int, default=20)
+    parser.add_argument("--ocr-latency", type=float, default=1.5)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    for label, limits in [
+        ("serial", dict(max_workers=1, ocr_concurrency=1, llm_concurrency=1)),
+        ("concurrent", dict(max_workers=8, ocr_concurrency=4, llm_concurrency=4)),
+    ]:
+        elapsed, ocr_calls, llm_calls = run(args.receipts, args.ocr_latency, args.llm_latency, **limits)
+        print(f"{label}: {args.receipts} receipts in {elapsed:.2f}s"
+              f" ({ocr_calls} OCR calls, {llm_calls} LLM calls, {limits})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Microbenchmarks for the hot paths, with JSON results and regression checks.
+
+Seeds a throwaway store with synthetic transactions (finsight.synthetic)
+at each row count and times spending stats, dashboard filtering,
+categorization, DataFrame construction and prompt building. Batch
+categorization runs against a FakeModel sleeping --llm-latency seconds per
+call. Each case reports the median and best of --repeat runs, where a run
+loops the case often enough to take a measurable time.
+
+    python benchmarks/suite.py --rows 1000 100000 1000000 --output baseline.json
+    python benchmarks/suite.py --compare baseline.json --budgets benchmarks/budgets.json
+
+--compare flags cases whose best run got more than --threshold slower
+than the baseline's (the best run is the least noisy), --budgets flags
+cases whose median is over budget in milliseconds, and either exits
+non-zero so the suite can gate a CI job.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from finsight.analytics import SpendingIndex, get_spending_stats  # noqa: E402
+from finsight.categorize import (  # noqa: E402
+    build_batch_prompt, categorize_batch, categorize_by_keywords, categorize_series_by_keywords,
+)
+from finsight.charts import daily_frame, over_time  # noqa: E402
+from finsight.classifier import ItemClassifier  # noqa: E402
+from finsight.fakes import FakeModel  # noqa: E402
+from finsight.filters import transaction_mask  # noqa: E402
+from finsight.insights import build_summary, insights_prompt  # noqa: E402
+from finsight.storage import TransactionStore  # noqa: E402
+from finsight.synthetic import labelled_items, seed_store  # noqa: E402
+
+# Names categorized one at a time by the scalar keyword case, and items per receipt
+KEYWORD_NAMES = 10_000
+RECEIPT_ITEMS = 40
+
+
+def measure(func, repeat):
+    """(median, best) seconds per call of ``func`` over ``repeat`` runs"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [seconds / number for seconds in timer.repeat(repeat, number)]
+    return statistics.median(runs), min(runs), number
+
+
+def sized_cases(store, frame):
+    """{name: callable} for cases whose cost grows with the number of stored rows"""
+    df = store.query()
+    index = SpendingIndex(store).sync()
+    names = frame["Name"]
+    return {
+        "stats.index_build": lambda: SpendingIndex(store).sync(),
+        "stats.spending": lambda: get_spending_stats(index),
+        "dataframe.query": store.query,
+        "dataframe.filter": lambda: df[transaction_mask(df, ["Want"], ["Groceries", "Snacks"])],
+        "charts.aggregate": lambda: over_time(daily_frame(store.daily_totals()), "Category", "Month"),
+        "categorize.keywords": lambda: [categorize_by_keywords(name) for name in names[:KEYWORD_NAMES]],
+        "categorize.series": lambda: categorize_series_by_keywords(names),
+        "prompt.insights": lambda: insights_prompt(build_summary(df)),
+    }
+
+
+def fixed_cases(llm_latency):
+    """{name: callable} for cases that only depend on one receipt's worth of items"""
+    rows = labelled_items(2000 + RECEIPT_ITEMS, seed=1)
+    classifier = ItemClassifier()
+    classifier.learn(rows[RECEIPT_ITEMS:])
+    receipt = [{"Name": name, "Price": 3.5} for name, _, _ in rows[:RECEIPT_ITEMS]]
+    model = FakeModel(latency=llm_latency)
+    return {
+        "prompt.batch": lambda: build_batch_prompt(receipt),
+        "categorize.classifier": lambda: classifier.predict_many(item["Name"] for item in receipt),
+        "categorize.batch": lambda: categorize_batch([dict(item) for item in receipt], model),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(row_counts, repeat, llm_latency, only=None):
+    """{case: {"median_ms", "best_ms", "number"}}; sized cases are keyed "name@rows" """
+    results = {}
+
+    def record(key, func):
+        if only and not any(pattern in key for pattern in only):
+            return
+        median, best, number = measure(func, repeat)
+        results[key] = {"median_ms": median * 1000, "best_ms": best * 1000, "number": number}
+        print(f"  {key:<34} {median * 1000:>11,.3f} ms  (best {best * 1000:,.3f}, x{number})", flush=True)
+
+    for name, func in fixed_cases(llm_latency).items():
+        record(name, func)
+    for rows in row_counts:
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = TransactionStore(os.path.join(data_dir, "finsight.db"))
+            began = time.perf_counter()
+            frame = seed_store(store, rows)
+            print(f"{rows:,} rows seeded in {time.perf_counter() - began:.1f}s", flush=True)
+            for name, func in sized_cases(store, frame).items():
+                record(f"{name}@{rows}", func)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Case names whose best run is more than ``threshold`` (a fraction) slower than in ``baseline``"""
+    regressions = []
+    print(f"\n  {'case':<34} {'baseline':>12} {'now':>12} {'change':>8}")
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        change = result["best_ms"] / before["best_ms"] - 1 if before["best_ms"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(key)
+        print(f"  {key:<34} {before['best_ms']:>9,.3f} ms {result['best_ms']:>9,.3f} ms"
+              f" {change:>+8.0%}{flag}")
+    return regressions
+
+
+def over_budget(results, budgets):
+    """Case names whose median exceeds its budget in milliseconds"""
+    failures = []
+    for key, limit in budgets.items():
+        result = results.get(key)
+        if result is not None and result["median_ms"] > limit:
+            failures.append(key)
+            print(f"  OVER BUDGET {key}: {result['median_ms']:,.3f} ms > {limit:,.3f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake Gemini call")
+    parser.add_argument("--only", nargs="+", help="run only cases whose name contains one of these")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier --output")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="slowdown against the baseline counted as a regression (0.3 = 30%%)")
+    parser.add_argument("--budgets", help='JSON file of {"case": max median ms}, e.g. benchmarks/budgets.json')
+    args = parser.parse_args()
+
+    results = run_suite(args.rows, args.repeat, args.llm_latency, args.only)
+    if args.output:
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "repeat": args.repeat,
+            "llm_latency": args.llm_latency,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = []
+    if args.compare:
+        with open(args.compare) as f:
+            failed += compare(results, json.load(f)["results"], args.threshold)
+    if args.budgets:
+        with open(args.budgets) as f:
+            failed += over_budget(results, json.load(f))
+    if failed:
+        raise SystemExit(f"{len(failed)} case(s) regressed or went over budget: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
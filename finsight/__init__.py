@@ -0,0 +1 @@
+"""Core FinSight library: receipt processing, categorization and spending data"""
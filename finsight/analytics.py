@@ -0,0 +1,93 @@
+"""Constant-time spending totals over arbitrary date ranges"""
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from finsight.categorize import CATEGORIES, WANT_NEED
+
+# One column per (category, want/need) pair
+_BUCKETS = {(category, want_need): i * len(WANT_NEED) + j
+            for i, category in enumerate(CATEGORIES)
+            for j, want_need in enumerate(WANT_NEED)}
+
+
+class SpendingIndex:
+    """Cumulative per-day totals for every category and want/need pair.
+
+    Built from the store's daily rollup table rather than from line
+    items, and rebuilt only when the store version changes. Any range
+    total is then a difference of two prefix sums.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = None
+        self._lock = threading.Lock()
+        # (first day ordinal, prefix sums); row r holds spending before day first + r,
+        # so row 0 is all zeros. Swapped as one tuple so readers never see a mix
+        self._prefix = (0, np.zeros((1, len(_BUCKETS))))
+
+    def sync(self):
+        """Reload the rollups if the store has changed since the last build"""
+        version = self.store.version
+        if version == self.version:
+            return self
+        with self._lock:
+            if version != self.version:
+                self._build(self.store.daily_totals())
+                self.version = version
+        return self
+
+    def _build(self, rows):
+        days = [date.fromisoformat(row[0]).toordinal() for row in rows]
+        if not days:
+            self._prefix = (0, np.zeros((1, len(_BUCKETS))))
+            return
+        first_day = min(days)
+        daily = np.zeros((max(days) - first_day + 2, len(_BUCKETS)))
+        for day, (_, category, want_need, total) in zip(days, rows):
+            daily[day - first_day + 1, _BUCKETS.get((category, want_need), _BUCKETS[("Other", "Need")])] += total
+        self._prefix = (first_day, daily.cumsum(axis=0))
+
+    def totals(self, start=None, end=None):
+        """Spending with start <= date < end for every bucket, as an array"""
+        first_day, cumulative = self._prefix
+        last_row = len(cumulative) - 1
+
+        def row(day, default):
+            if day is None:
+                return default
+            return min(max(day.toordinal() - first_day, 0), last_row)
+
+        return cumulative[row(end, last_row)] - cumulative[row(start, 0)]
+
+    def total(self, start=None, end=None, categories=None, want_need=None):
+        """Spending with start <= date < end, optionally limited to some categories / want or need"""
+        totals = self.totals(start, end)
+        if categories is None and want_need is None:
+            return float(totals.sum())
+        columns = [
+            column for (category, kind), column in _BUCKETS.items()
+            if (categories is None or category in categories) and (want_need is None or kind in want_need)
+        ]
+        return float(totals[columns].sum())
+
+    def by_category(self, start=None, end=None):
+        """{category: spending} for start <= date < end"""
+        totals = self.totals(start, end)
+        return {category: float(sum(totals[_BUCKETS[(category, kind)]] for kind in WANT_NEED))
+                for category in CATEGORIES}
+
+
+def get_spending_stats(index, today=None):
+    """Current month, last month and this week's spending from a SpendingIndex"""
+    today = today or date.today()
+    current_month = today.replace(day=1)
+    last_month = (current_month - timedelta(days=1)).replace(day=1)
+    week_start = today - timedelta(days=today.weekday())
+    return {
+        "Current Month": index.total(start=current_month),
+        "Last Month": index.total(start=last_month, end=current_month),
+        "This Week": index.total(start=week_start),
+    }
@@ -0,0 +1,159 @@
+"""Durable caches backed by SQLite"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+# Prices, long digit runs (SKU/UPC codes) and "#123"-style item numbers
+_NOISE = re.compile(r"\$?\d+\.\d{2}\b|#\s*\w+|\b\d{4,}\b")
+_PUNCTUATION = re.compile(r"[^\w%&\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_name(name):
+    """Reduce a receipt item name to a stable cache key, e.g. ' MILK 2%  GAL 3.99' -> 'milk 2% gal'"""
+    name = _NOISE.sub(" ", str(name or "").lower())
+    name = _PUNCTUATION.sub(" ", name)
+    return _SPACES.sub(" ", name).strip()
+
+
+class CategoryCache:
+    """Maps normalized item names to their (Category, Want or Need) result.
+
+    Entries beyond ``max_entries`` are evicted least recently used first.
+    Results from user corrections are never overwritten by model answers.
+    Safe to share between Streamlit sessions.
+    """
+
+    def __init__(self, path, max_entries=50_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS categories (
+                    name TEXT PRIMARY KEY,
+                    category TEXT NOT NULL,
+                    want_need TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS categories_last_used ON categories (last_used)")
+
+    def get_many(self, names):
+        """Look up item names, returning {normalized name: (category, want_need)} for hits"""
+        keys = {normalize_name(name) for name in names} - {""}
+        found = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT category, want_need FROM categories WHERE name = ?", (key,)
+                ).fetchone()
+                if row:
+                    found[key] = row
+            if found:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE categories SET last_used = ? WHERE name = ?",
+                        [(time.time(), key) for key in found],
+                    )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries, source="model"):
+        """Store (name, category, want_need) entries; source="user" marks a correction"""
+        rows = [
+            (normalize_name(name), category, want_need, source, time.time())
+            for name, category, want_need in entries
+            if normalize_name(name)
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO categories (name, category, want_need, source, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    category = excluded.category,
+                    want_need = excluded.want_need,
+                    source = excluded.source,
+                    last_used = excluded.last_used
+                WHERE categories.source != 'user' OR excluded.source = 'user'
+            """, rows)
+            self._conn.execute("""
+                DELETE FROM categories WHERE name IN (
+                    SELECT name FROM categories ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def labelled(self):
+        """Every stored (name, category, want_need, source) row, e.g. to train a classifier"""
+        with self._lock:
+            return self._conn.execute("SELECT name, category, want_need, source FROM categories").fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+
+
+class ResultCache:
+    """JSON results keyed by a string such as a content hash.
+
+    Entries expire ``ttl`` seconds after being stored and are evicted
+    least recently used first once there are more than ``max_entries``.
+    """
+
+    def __init__(self, path, ttl=30 * 24 * 3600, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def get(self, key):
+        """Return the stored value, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE key = ? AND created > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Store a JSON-serializable value; dates are written as ISO strings"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=_isoformat), now, now),
+            )
+            self._conn.execute("DELETE FROM results WHERE created <= ?", (now - self.ttl,))
+            self._conn.execute("""
+                DELETE FROM results WHERE key IN (
+                    SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+
+def _isoformat(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,168 @@
+"""Receipt item categorization"""
+import json
+import re
+import time
+from dataclasses import dataclass
+
+from finsight import tracing
+from finsight.cache import normalize_name
+from finsight.rules import default_matcher
+
+CATEGORIES = ["Groceries", "Snacks", "Household", "Subscriptions", "Other"]
+WANT_NEED = ["Want", "Need"]
+
+# Items sent to the model per request; large receipts are split into chunks
+BATCH_SIZE = 25
+
+# Want or Need for items categorized without a model answer, by category
+DEFAULT_WANT_NEED = {
+    "Groceries": "Need",
+    "Household": "Need",
+    "Snacks": "Want",
+    "Subscriptions": "Want",
+    "Other": "Need",
+}
+
+
+@dataclass
+class CategorizationStats:
+    """Cost of categorizing one receipt"""
+    items: int = 0
+    cached: int = 0
+    local: int = 0
+    calls: int = 0
+    fallbacks: int = 0
+    seconds: float = 0.0
+
+
+def categorize_by_keywords(item_name):
+    """Fallback categorization using the keyword rule table (finsight/rules.json)"""
+    return default_matcher().match(item_name)
+
+
+def categorize_series_by_keywords(names):
+    """Keyword categories for a whole Series of item names at once, e.g. to re-categorize history"""
+    return default_matcher().match_series(names)
+
+
+def build_batch_prompt(items):
+    """Build a single prompt asking for the category and want/need of every item"""
+    rows = [
+        {"index": i, "name": item["Name"], "price": item["Price"]}
+        for i, item in enumerate(items)
+    ]
+    return f"""
+    Categorize each receipt item below. For every item decide:
+    - "category": one of {", ".join(CATEGORIES)}
+    - "want_or_need": either "Want" or "Need"
+
+    Respond with only a JSON array, one object per item, in this form:
+    [{{"index": 0, "category": "Groceries", "want_or_need": "Need"}}]
+
+    Items:
+    {json.dumps(rows)}
+    """
+
+
+def parse_batch_response(text):
+    """Extract the list of result rows from a model response, or [] if it is unusable"""
+    # Models sometimes wrap JSON in a markdown code fence or add prose around it
+    match = re.search(r"\[.*\]", text or "", re.DOTALL)
+    if not match:
+        return []
+    try:
+        rows = json.loads(match.group(0))
+    except ValueError:
+        return []
+    return [row for row in rows if isinstance(row, dict)] if isinstance(rows, list) else []
+
+
+def apply_batch_response(items, rows):
+    """Write valid result rows onto items and return the indexes still lacking an answer
+
+    A row counts only when both its category and its want/need are valid;
+    otherwise the item is left as it was.
+    """
+    pending = set(range(len(items)))
+    for row in rows:
+        index = row.get("index")
+        if not isinstance(index, int) or index not in pending:
+            continue
+        category = str(row.get("category", "")).strip()
+        want_need = str(row.get("want_or_need", "")).strip().capitalize()
+        if category in CATEGORIES and want_need in WANT_NEED:
+            items[index]["Category"], items[index]["Want or Need"] = category, want_need
+            pending.discard(index)
+    return pending
+
+
+def categorize_batch(items, model, batch_size=BATCH_SIZE, cache=None, classifier=None):
+    """Categorize items with one model call per chunk of a receipt.
+
+    ``model`` is anything with a Gemini-style ``generate_content(prompt)``
+    method returning an object with ``.text``, so a fake can stand in
+    offline. Items found in ``cache`` (a CategoryCache) skip the model, as
+    do items ``classifier`` (an ItemClassifier) is confident about; it
+    learns from the model's answers. Rows the model gets wrong or leaves
+    out fall back to keyword matching and the category's usual want/need,
+    and are neither cached nor learned. Items are updated in place;
+    returns a CategorizationStats.
+    """
+    stats = CategorizationStats(items=len(items))
+    pending = items
+    if cache is not None:
+        known = cache.get_many(item["Name"] for item in items)
+        pending = []
+        for item in items:
+            hit = known.get(normalize_name(item["Name"]))
+            if hit:
+                item["Category"], item["Want or Need"] = hit
+                stats.cached += 1
+            else:
+                pending.append(item)
+
+    if classifier is not None and pending:
+        unsure = []
+        guesses = classifier.predict_many(item["Name"] for item in pending)
+        for item, (category, want_need, confidence) in zip(pending, guesses):
+            if confidence >= classifier.min_confidence:
+                item["Category"], item["Want or Need"] = category, want_need
+                stats.local += 1
+            else:
+                unsure.append(item)
+        pending = unsure
+        tracing.count("categorize.local", stats.local)
+
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        began = time.perf_counter()
+        prompt = build_batch_prompt(chunk)
+        with tracing.span("llm.categorize", items=len(chunk)) as span:
+            try:
+                response = model.generate_content(prompt)
+                rows = parse_batch_response(response.text)
+                prompt_tokens, response_tokens = tracing.token_usage(response, prompt, response.text)
+                span.set(prompt_tokens=prompt_tokens, response_tokens=response_tokens)
+            except Exception as e:
+                # A failed chunk only costs this chunk its AI categorization
+                rows = []
+                span.set(error=type(e).__name__)
+            finally:
+                stats.calls += 1
+                stats.seconds += time.perf_counter() - began
+
+        failed = apply_batch_response(chunk, rows)
+        for index in failed:
+            category = categorize_by_keywords(chunk[index]["Name"])
+            chunk[index]["Category"], chunk[index]["Want or Need"] = category, DEFAULT_WANT_NEED.get(category, "Need")
+            stats.fallbacks += 1
+        # Only model answers are worth remembering; keyword guesses get another try next time
+        answered = [
+            (item["Name"], item["Category"], item["Want or Need"])
+            for index, item in enumerate(chunk) if index not in failed
+        ]
+        if cache is not None:
+            cache.put_many(answered)
+        if classifier is not None:
+            classifier.learn(answered)
+    return stats
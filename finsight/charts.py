@@ -0,0 +1,82 @@
+"""Dashboard charts drawn from pre-aggregated spending buckets.
+
+Aggregation happens here in pandas, starting from the store's daily
+rollups rather than line items, so the data handed to Plotly (and sent
+to the browser) grows with the number of days, categories and buckets
+shown, not with the number of transactions.
+"""
+import pandas as pd
+
+from finsight.categorize import CATEGORIES, WANT_NEED
+
+# Time bucket choices on the dashboard and their pandas groupers. Weeks run Monday to Sunday,
+# as the "This Week" metric counts them, and like months are labelled with their first day
+FREQUENCIES = {
+    "Day": {"freq": "D"},
+    "Week": {"freq": "W-MON", "closed": "left", "label": "left"},
+    "Month": {"freq": "MS"},
+}
+
+# Consistent colours across charts and reruns
+CATEGORY_COLORS = dict(zip(CATEGORIES, ["#2ca02c", "#ff7f0e", "#1f77b4", "#9467bd", "#7f7f7f"]))
+WANT_NEED_COLORS = {"Want": "#e377c2", "Need": "#17becf"}
+
+
+def daily_frame(rows):
+    """Store daily_totals rows as a typed (Date, Category, Want or Need, Price) DataFrame"""
+    df = pd.DataFrame(rows, columns=["Date", "Category", "Want or Need", "Price"])
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["Category"] = pd.Categorical(df["Category"], categories=CATEGORIES)
+    df["Want or Need"] = pd.Categorical(df["Want or Need"], categories=WANT_NEED)
+    return df
+
+
+def select_daily(daily, want_need=(), categories=()):
+    """Daily rollups matching the dashboard filters; an empty selection keeps everything"""
+    mask = pd.Series(True, index=daily.index)
+    if want_need:
+        mask &= daily["Want or Need"].isin(want_need)
+    if categories:
+        mask &= daily["Category"].isin(categories)
+    return daily[mask]
+
+
+def by_category(daily):
+    """Total spending per category, largest first, without empty categories"""
+    totals = daily.groupby("Category", observed=True)["Price"].sum().round(2)
+    return totals[totals > 0].sort_values(ascending=False).reset_index()
+
+
+def over_time(daily, column, frequency="Month"):
+    """Spending per time bucket and value of ``column`` (e.g. "Category" or "Want or Need")"""
+    grouped = daily.groupby([pd.Grouper(key="Date", **FREQUENCIES[frequency]), column], observed=True)
+    buckets = grouped["Price"].sum().round(2).reset_index()
+    return buckets[buckets["Price"] != 0]
+
+
+def category_pie(totals):
+    """Pie of spending by category from ``by_category`` output"""
+    import plotly.express as px
+
+    return px.pie(totals, values="Price", names="Category", title="Spending by Category",
+                  color="Category", color_discrete_map=CATEGORY_COLORS)
+
+
+def spend_over_time_chart(buckets, frequency="Month"):
+    """Stacked bars of spending per time bucket and category from ``over_time`` output"""
+    import plotly.express as px
+
+    fig = px.bar(buckets, x="Date", y="Price", color="Category", title=f"Spending per {frequency}",
+                 color_discrete_map=CATEGORY_COLORS, category_orders={"Category": CATEGORIES})
+    fig.update_layout(yaxis_tickprefix="$", xaxis_title=None, yaxis_title=None, bargap=0.1)
+    return fig
+
+
+def want_need_chart(buckets, frequency="Month"):
+    """Want vs need spending lines per time bucket from ``over_time`` output"""
+    import plotly.express as px
+
+    fig = px.line(buckets, x="Date", y="Price", color="Want or Need", markers=len(buckets) < 60,
+                  title=f"Wants vs Needs per {frequency}", color_discrete_map=WANT_NEED_COLORS)
+    fig.update_layout(yaxis_tickprefix="$", xaxis_title=None, yaxis_title=None)
+    return fig
@@ -0,0 +1,198 @@
+"""Local item categorizer learned from past answers and user corrections.
+
+Item names are turned into hashed character n-grams and scored with a
+multinomial naive Bayes model per label (Category, Want or Need). It
+learns incrementally from every model answer and every correction made in
+a transaction editor, so once it has seen enough items only the ones it
+is unsure about need a Gemini call.
+"""
+import atexit
+import math
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from finsight.cache import normalize_name
+from finsight.categorize import CATEGORIES, WANT_NEED
+
+# Hashed feature space; collisions are rare at receipt-vocabulary sizes
+DIMENSIONS = 2 ** 16
+NGRAMS = (3, 4, 5)
+
+# Corrections count for this many model answers, so they win over a model's earlier guess
+USER_WEIGHT = 5.0
+
+# Items below this confidence, or any item before MIN_EXAMPLES have been seen, go to the model.
+# Scored on products missing from training (benchmarks/classifier_eval.py), 0.9 let 18-33% wrong
+# answers through and 50 examples were 30-90% right; these give 93-100% on most splits.
+MIN_CONFIDENCE = 0.99
+MIN_EXAMPLES = 200
+
+# Seconds to wait after an update before saving, so a burst of updates is written once
+SAVE_DELAY = 5.0
+
+
+def item_features(name, dimensions=DIMENSIONS):
+    """Hashed word and character n-gram indexes for an item name"""
+    text = normalize_name(name)
+    if not text:
+        return np.empty(0, dtype=np.int64)
+    padded = f" {text} "
+    grams = [f"w:{word}" for word in text.split()]
+    for n in NGRAMS:
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    # crc32 rather than hash(), which is salted per process and would break saved models
+    return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.int64, count=len(grams)) % dimensions
+
+
+class ItemClassifier:
+    """Predicts (Category, Want or Need, confidence) for item names.
+
+    Safe to share between Streamlit sessions: updates are serialized and
+    predictions read an immutable snapshot of the model, rebuilt on the
+    first prediction after an update. When ``path`` is set, updates are
+    saved there ``save_delay`` seconds after the first unsaved one, and at
+    exit.
+    """
+
+    def __init__(self, path=None, dimensions=DIMENSIONS, alpha=0.1, min_confidence=MIN_CONFIDENCE,
+                 save_delay=SAVE_DELAY):
+        self.path = path
+        self.dimensions = dimensions
+        self.alpha = alpha
+        self.min_confidence = min_confidence
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._counts = {
+            "category": np.zeros((len(CATEGORIES), dimensions), dtype=np.float32),
+            "want_need": np.zeros((len(WANT_NEED), dimensions), dtype=np.float32),
+        }
+        self._documents = {label: np.zeros(len(counts), dtype=np.float64) for label, counts in self._counts.items()}
+        self._model = None
+        self._stale = True
+        self._unsaved = False
+        self._timer = None
+        if path:
+            atexit.register(self.flush)
+
+    @property
+    def examples(self):
+        """Total weight of the labelled items learned so far"""
+        return float(self._documents["category"].sum())
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Classifier saved at ``path``, or an empty one if nothing has been saved yet"""
+        classifier = cls(path, **kwargs)
+        if os.path.exists(path):
+            with np.load(path) as saved:
+                if saved["category"].shape[1] == classifier.dimensions:
+                    for label in classifier._counts:
+                        classifier._counts[label] = saved[label]
+                        classifier._documents[label] = saved[f"{label}_documents"]
+        return classifier
+
+    def save(self):
+        """Write the model to ``path`` now"""
+        if not self.path:
+            return
+        with self._lock:
+            # Copy under the lock so updates are not held up by the disk write
+            arrays = {label: counts.copy() for label, counts in self._counts.items()}
+            arrays.update({f"{label}_documents": docs.copy() for label, docs in self._documents.items()})
+            self._unsaved = False
+        with self._save_lock:
+            # Write then rename, so a crash never leaves a half-written model behind
+            partial = f"{self.path}.partial.npz"
+            np.savez(partial, **arrays)
+            os.replace(partial, self.path)
+
+    def flush(self):
+        """Save now if anything was learned since the last save"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            unsaved = self._unsaved
+        if unsaved:
+            self.save()
+
+    def learn(self, entries, weight=1.0):
+        """Update the model with (name, category, want_need) entries; saving waits for ``save_delay``"""
+        with self._lock:
+            for name, category, want_need in entries:
+                features = item_features(name, self.dimensions)
+                if not len(features) or category not in CATEGORIES or want_need not in WANT_NEED:
+                    continue
+                for label, value in (("category", CATEGORIES.index(category)), ("want_need", WANT_NEED.index(want_need))):
+                    np.add.at(self._counts[label][value], features, weight)
+                    self._documents[label][value] += weight
+                self._stale = self._unsaved = True
+            self._schedule_save()
+
+    def _schedule_save(self):
+        # Called with the lock held
+        if not self.path or not self._unsaved or self._timer is not None:
+            return
+        self._timer = threading.Timer(self.save_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _snapshot(self):
+        """(priors, table, examples), rebuilt first if the model was updated since the last one"""
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    self._refresh()
+                    self._stale = False
+        return self._model
+
+    def _refresh(self):
+        # Log-probabilities of both labels live in one feature-major table, so a
+        # prediction is a single row gather and sum
+        priors, tables = [], []
+        for label, counts in self._counts.items():
+            docs = self._documents[label]
+            priors.append(np.log((docs + 1) / (docs.sum() + len(docs))))
+            totals = counts.sum(axis=1, keepdims=True)
+            tables.append(np.log((counts + self.alpha) / (totals + self.alpha * self.dimensions)))
+        table = np.ascontiguousarray(np.vstack(tables).T, dtype=np.float32)
+        self._model = (np.concatenate(priors), table, self.examples)
+
+    def predict(self, name):
+        """(category, want_need, confidence) for one item name; confidence is 0 when untrained"""
+        prior, table, examples = self._snapshot()
+        features = item_features(name, self.dimensions)
+        if examples < MIN_EXAMPLES or not len(features):
+            return "Other", "Need", 0.0
+        # Scaling by the feature count tempers naive Bayes' overconfidence on long names
+        scores = (prior + table[features].sum(axis=0) / np.sqrt(len(features))).tolist()
+        answer, confidence = [], 1.0
+        # Softmax over a handful of plain floats is cheaper than more numpy calls
+        for classes, part in ((CATEGORIES, scores[:len(CATEGORIES)]), (WANT_NEED, scores[len(CATEGORIES):])):
+            top = max(part)
+            weights = [math.exp(score - top) for score in part]
+            best = part.index(top)
+            answer.append(classes[best])
+            confidence = min(confidence, 1 / sum(weights))
+        return answer[0], answer[1], confidence
+
+    def predict_many(self, names):
+        return [self.predict(name) for name in names]
+
+
+def train_from_cache(classifier, cache):
+    """Retrain ``classifier`` from scratch on every labelled name in a CategoryCache"""
+    fresh = ItemClassifier(dimensions=classifier.dimensions, alpha=classifier.alpha)
+    rows = cache.labelled()
+    fresh.learn(((name, category, want_need) for name, category, want_need, source in rows if source != "user"))
+    fresh.learn(((name, category, want_need) for name, category, want_need, source in rows if source == "user"),
+                weight=USER_WEIGHT)
+    with classifier._lock:
+        classifier._counts, classifier._documents = fresh._counts, fresh._documents
+        classifier._stale = classifier._unsaved = True
+    classifier.save()
+    return classifier
@@ -0,0 +1,317 @@
+"""Provider clients, built on first use.
+
+The provider SDKs are slow to import, so they are only loaded when a
+client is actually needed. Every call to a provider goes through one
+shared wrapper per provider, which keeps the request rate inside the
+account quota, retries transient failures with jittered exponential
+backoff and merges identical requests that are in flight at once.
+
+FINSIGHT_PROVIDERS=fake swaps the SDK clients for the offline stand-ins
+in finsight.fakes (replaying a recorded cassette if FINSIGHT_CASSETTE is
+set), and FINSIGHT_PROVIDERS=record records live answers to it. The
+stand-ins still go through the same wrappers, so pacing, retries and
+merging behave as they would live.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from finsight import tracing
+from finsight.config import (
+    CASSETTE, FAKE_ERROR_RATE, FAKE_LLM_LATENCY, FAKE_OCR_LATENCY, GEMINI_RPM, MINDEE_RPM, PROVIDERS, data_path,
+)
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# HTTP statuses worth another try: rate limited, or the provider is briefly unwell
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+# The same conditions as gRPC status names, which google.api_core and grpc errors may report instead
+RETRYABLE_GRPC_CODES = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED", "ABORTED", "INTERNAL"}
+
+
+def _cassette():
+    """The cassette FINSIGHT_CASSETTE names, or None; recording defaults to one in the data directory"""
+    if PROVIDERS not in ("live", "record", "fake"):
+        raise ValueError(f"FINSIGHT_PROVIDERS must be live, record or fake, not {PROVIDERS!r}")
+    from finsight.fakes import open_cassette
+
+    if PROVIDERS == "record":
+        return open_cassette(CASSETTE or data_path("cassette.jsonl"))
+    return open_cassette(CASSETTE) if CASSETTE else None
+
+
+def make_gemini_model(name=GEMINI_MODEL):
+    """Configured Gemini model, or the stand-in FINSIGHT_PROVIDERS asks for"""
+    if PROVIDERS != "live":
+        cassette = _cassette()
+        if PROVIDERS == "fake":
+            from finsight.fakes import FakeModel
+            return FakeModel(latency=FAKE_LLM_LATENCY, error_rate=FAKE_ERROR_RATE, cassette=cassette)
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    model = genai.GenerativeModel(name)
+    if PROVIDERS == "record":
+        from finsight.fakes import RecordingModel
+        return RecordingModel(model, cassette)
+    return model
+
+
+def make_mindee_client():
+    """Mindee client for receipt OCR, or the stand-in FINSIGHT_PROVIDERS asks for"""
+    if PROVIDERS != "live":
+        cassette = _cassette()
+        if PROVIDERS == "fake":
+            from finsight.fakes import FakeMindee
+            return FakeMindee(latency=FAKE_OCR_LATENCY, error_rate=FAKE_ERROR_RATE, cassette=cassette)
+    from mindee import Client
+
+    # MINDDEE_API_KEY is the misspelled name earlier versions read
+    client = Client(api_key=os.getenv("MINDEE_API_KEY") or os.getenv("MINDDEE_API_KEY"))
+    if PROVIDERS == "record":
+        from finsight.fakes import RecordingMindee
+        return RecordingMindee(client, cassette)
+    return client
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    ``capacity`` bounds how many calls may go out back to back after an
+    idle spell; keep it small so a burst plus the steady rate still fits
+    in the provider's per-minute window.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Take one token, waiting for it if necessary.
+
+        ``deadline`` is a ``time.monotonic()`` timestamp; raises
+        TimeoutError if no token would be available before it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                raise TimeoutError("Provider rate limit would be exceeded before the deadline")
+            tracing.count("provider.throttled_seconds", wait)
+            time.sleep(wait)
+
+
+def _status(error):
+    """HTTP status (an int) or gRPC status name (a str) an SDK error reports, or None"""
+    # Mindee and requests HTTP errors carry ``status_code``; google.api_core errors an HTTPStatus
+    # ``code`` and a ``grpc_status_code``; raw grpc errors a ``code()`` method returning a StatusCode
+    candidates = [
+        getattr(error, "status_code", None),
+        getattr(error, "code", None),
+        getattr(error, "grpc_status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ]
+    for status in candidates:
+        if callable(status):
+            try:
+                status = status()
+            except Exception:
+                continue
+        if isinstance(status, int) and not isinstance(status, bool):
+            return int(status)
+        name = getattr(status, "name", None)
+        if isinstance(name, str):
+            return name
+    return None
+
+
+def is_retryable(error):
+    """Whether a provider error is transient (rate limits, timeouts, 5xx, dropped connections)"""
+    status = _status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES or status in RETRYABLE_GRPC_CODES
+    # Covers the builtin ConnectionError and TimeoutError and, as subclasses of OSError,
+    # the requests ConnectionError and Timeout the Mindee and Google SDKs raise
+    return isinstance(error, OSError)
+
+
+def call_with_retry(func, limiter=None, deadline=None, attempts=4, base_delay=0.5, max_delay=8.0):
+    """Call ``func()``, retrying transient errors with full-jitter exponential backoff.
+
+    Each attempt first takes a token from ``limiter``. ``deadline`` is a
+    ``time.monotonic()`` timestamp after which no further attempt starts;
+    the last error is raised once attempts or time run out.
+    """
+    for attempt in range(attempts):
+        if limiter is not None:
+            limiter.acquire(deadline)
+        try:
+            return func()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise
+            tracing.count("provider.retries")
+            time.sleep(delay)
+
+
+class _InFlight:
+    """Merges concurrent calls that share a key into the first caller's call"""
+
+    def __init__(self):
+        self.merged = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Return ``(future, leader)``; the leader must resolve the future and then ``leave``"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.merged += 1
+                tracing.count("provider.merged")
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def leave(self, key):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def run(self, key, func):
+        """``func()``, or the result of the identical call already running"""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self.leave(key)
+
+
+class GeminiClient:
+    """Rate-limited, retrying front for a Gemini model shared across sessions.
+
+    Keeps the ``generate_content(prompt, stream=False)`` interface of
+    ``genai.GenerativeModel`` so it can be passed wherever a model is
+    expected. ``timeout`` is the default number of seconds a call may
+    spend waiting for quota and retrying; a call's own ``timeout``
+    overrides it.
+    """
+
+    def __init__(self, model, requests_per_minute=GEMINI_RPM, burst=None, timeout=60.0, attempts=4):
+        self.model = model
+        self.limiter = TokenBucket(requests_per_minute / 60, burst or max(1, int(requests_per_minute) // 10))
+        self.timeout = timeout
+        self.attempts = attempts
+        self._inflight = _InFlight()
+
+    @property
+    def merged(self):
+        """Calls answered by joining an identical call already in flight"""
+        return self._inflight.merged
+
+    def generate_content(self, prompt, stream=False, timeout=None):
+        """Response for ``prompt``; identical prompts already in flight share its call"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        if stream:
+            return self._stream(prompt, deadline)
+        return self._inflight.run(("text", prompt), lambda: call_with_retry(
+            lambda: self.model.generate_content(prompt), self.limiter, deadline, self.attempts
+        ))
+
+    def _stream(self, prompt, deadline):
+        key = ("stream", prompt)
+        future, leader = self._inflight.join(key)
+        if not leader:
+            # Followers wait for the leader and get the whole text as one chunk
+            yield SimpleNamespace(text=future.result(timeout=max(0, deadline - time.monotonic())))
+            return
+
+        def start():
+            # Errors surface with the first chunk, so that is the part worth retrying
+            chunks = iter(self.model.generate_content(prompt, stream=True))
+            return chunks, next(chunks, None)
+
+        text = ""
+        try:
+            chunks, first = call_with_retry(start, self.limiter, deadline, self.attempts)
+            if first is not None:
+                for chunk in _prepend(first, chunks):
+                    try:
+                        text += chunk.text
+                    except ValueError:
+                        pass
+                    yield chunk
+        except GeneratorExit:
+            future.set_exception(RuntimeError("The merged response stream was abandoned"))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(text)
+        finally:
+            self._inflight.leave(key)
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+class MindeeClient:
+    """Rate-limited, retrying front for a Mindee client shared across sessions.
+
+    Mirrors the ``source_from_bytes``/``parse`` calls the OCR step makes.
+    Mindee closes an input source once it is sent, so sources are kept as
+    bytes and rebuilt for each attempt. Parses of the same image already
+    in flight share one request.
+    """
+
+    def __init__(self, client, requests_per_minute=MINDEE_RPM, burst=None, timeout=120.0, attempts=4):
+        self.client = client
+        self.limiter = TokenBucket(requests_per_minute / 60, burst or max(1, int(requests_per_minute) // 10))
+        self.timeout = timeout
+        self.attempts = attempts
+        self._inflight = _InFlight()
+
+    @property
+    def merged(self):
+        """Parses answered by joining an identical parse already in flight"""
+        return self._inflight.merged
+
+    def source_from_bytes(self, input_bytes, filename):
+        return SimpleNamespace(input_bytes=input_bytes, filename=filename)
+
+    def parse(self, product_class, input_source, timeout=None):
+        """Mindee's parse of ``input_source``; parses of the same image already in flight share its call"""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        source = input_source
+
+        def call():
+            return self.client.parse(product_class, self.client.source_from_bytes(source.input_bytes, source.filename))
+
+        key = (product_class.__name__, hashlib.sha256(source.input_bytes).hexdigest())
+        return self._inflight.run(key, lambda: call_with_retry(call, self.limiter, deadline, self.attempts))
@@ -0,0 +1,29 @@
+"""Runtime settings shared by the FinSight modules"""
+import os
+
+from dotenv import load_dotenv
+
+# API keys and settings may come from a .env file in the working directory
+load_dotenv()
+
+# Where caches and the transaction store live; override for tests or deployments
+DATA_DIR = os.getenv("FINSIGHT_DATA_DIR", ".finsight")
+
+
+def data_path(filename):
+    """Path of a file inside the data directory, creating the directory if needed"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+# Provider request quotas per minute; calls are paced to stay inside them
+GEMINI_RPM = float(os.getenv("FINSIGHT_GEMINI_RPM", "15"))
+MINDEE_RPM = float(os.getenv("FINSIGHT_MINDEE_RPM", "60"))
+
+# Which provider backends to use: "live", "record" (live, saving every answer to FINSIGHT_CASSETTE)
+# or "fake" (offline stand-ins replaying FINSIGHT_CASSETTE if set) for load tests and demos
+PROVIDERS = os.getenv("FINSIGHT_PROVIDERS", "live").lower()
+CASSETTE = os.getenv("FINSIGHT_CASSETTE")
+# Seconds per call and share of calls failing with a retryable error, for the fake providers
+FAKE_OCR_LATENCY = float(os.getenv("FINSIGHT_FAKE_OCR_LATENCY", "1.5"))
+FAKE_LLM_LATENCY = float(os.getenv("FINSIGHT_FAKE_LLM_LATENCY", "1.0"))
+FAKE_ERROR_RATE = float(os.getenv("FINSIGHT_FAKE_ERROR_RATE", "0"))
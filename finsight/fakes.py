@@ -0,0 +1,265 @@
+"""Offline stand-ins for the Gemini and Mindee clients.
+
+The fakes answer locally after a configurable delay and fail a given
+share of calls with a retryable error. Given a Cassette they replay
+answers recorded from the real services by RecordingModel and
+RecordingMindee, so load tests see realistic receipts and responses.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from finsight.categorize import categorize_by_keywords
+from finsight.insights import SECTIONS
+
+
+class ProviderError(Exception):
+    """Injected provider failure carrying an HTTP status, like the SDKs' own errors"""
+
+    def __init__(self, status_code=503):
+        super().__init__(f"Simulated provider error ({status_code})")
+        self.status_code = status_code
+
+
+class Cassette:
+    """Provider answers recorded to a JSON lines file.
+
+    Gemini answers are keyed by prompt and Mindee line items by the hash
+    of the image sent. Recording appends, so a cassette can be built up
+    over several sessions.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["provider"], entry["key"]] = entry["value"]
+
+    def get(self, provider, key):
+        return self._entries.get((provider, key))
+
+    def values(self, provider):
+        """Every answer recorded for ``provider``"""
+        return [value for (name, _), value in self._entries.items() if name == provider]
+
+    def put(self, provider, key, value):
+        with self._lock:
+            if self._entries.get((provider, key)) == value:
+                return
+            self._entries[provider, key] = value
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"provider": provider, "key": key, "value": value}) + "\n")
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def open_cassette(path):
+    """The process-wide Cassette for ``path``, so both providers append to it under one lock"""
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+class _Faults:
+    """Latency and random failures for one fake provider"""
+
+    def __init__(self, latency, error_rate, seed):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise ProviderError(self._random.choice([429, 503]))
+
+
+def keyword_responder(prompt):
+    """Answer a batch categorization prompt using keyword matching"""
+    match = re.search(r"Items:\s*(\[.*\])", prompt, re.DOTALL)
+    rows = json.loads(match.group(1)) if match else []
+    return json.dumps([
+        {"index": row["index"], "category": categorize_by_keywords(row["name"]), "want_or_need": "Need"}
+        for row in rows
+    ])
+
+
+def insights_responder(prompt):
+    """Answer an insights prompt with placeholder bullets under each section heading"""
+    return "\n\n".join(f"# {title}\n- Simulated insight\n- Simulated insight" for title in SECTIONS)
+
+
+def default_responder(prompt):
+    """Keyword categories for batch categorization prompts, placeholder insights for anything else"""
+    return keyword_responder(prompt) if "Items:" in prompt else insights_responder(prompt)
+
+
+class FakeModel:
+    """Drop-in for ``genai.GenerativeModel`` that answers locally.
+
+    ``responder`` maps a prompt to response text, unless ``cassette`` holds
+    a recorded answer for it; ``latency`` seconds are slept per call to
+    mimic a network round trip, and ``error_rate`` of calls fail with a
+    retryable ProviderError.
+    """
+
+    def __init__(self, responder=default_responder, latency=0.0, error_rate=0.0, cassette=None, seed=None):
+        self.responder = responder
+        self.cassette = cassette
+        self.replayed = 0
+        self._faults = _Faults(latency, error_rate, seed)
+
+    @property
+    def latency(self):
+        return self._faults.latency
+
+    @property
+    def calls(self):
+        return self._faults.calls
+
+    @property
+    def errors(self):
+        return self._faults.errors
+
+    def generate_content(self, prompt, stream=False):
+        self._faults.call()
+        text = self.cassette.get("gemini", prompt) if self.cassette is not None else None
+        if text is None:
+            text = self.responder(prompt)
+        else:
+            self.replayed += 1
+        if stream:
+            # Gemini streams an iterable of partial responses
+            return [SimpleNamespace(text=line) for line in text.splitlines(keepends=True)]
+        return SimpleNamespace(text=text)
+
+
+class FakeMindee:
+    """Drop-in for ``mindee.Client`` returning the same line items for every receipt.
+
+    With a ``cassette``, an image recorded before gets its recorded items
+    and any other image one of the recorded receipts, picked by its hash.
+    ``latency`` and ``error_rate`` work as for FakeModel.
+    """
+
+    def __init__(self, items=(("MILK 2% GAL", 3.99), ("BANANAS", 1.29), ("PAPER TOWELS", 8.49)), latency=0.0,
+                 error_rate=0.0, cassette=None, seed=None):
+        self.items = list(items)
+        self.cassette = cassette
+        self._faults = _Faults(latency, error_rate, seed)
+
+    @property
+    def latency(self):
+        return self._faults.latency
+
+    @property
+    def calls(self):
+        return self._faults.calls
+
+    @property
+    def errors(self):
+        return self._faults.errors
+
+    def source_from_bytes(self, input_bytes, filename):
+        return SimpleNamespace(input_bytes=input_bytes, filename=filename)
+
+    def _line_items(self, image_bytes):
+        if self.cassette is None:
+            return self.items
+        key = hashlib.sha256(image_bytes).hexdigest()
+        recorded = self.cassette.get("mindee", key)
+        if recorded is None:
+            receipts = self.cassette.values("mindee")
+            recorded = receipts[int(key, 16) % len(receipts)] if receipts else self.items
+        return recorded
+
+    def parse(self, product_class, input_source):
+        self._faults.call()
+        line_items = [SimpleNamespace(description=name, total_amount=price)
+                      for name, price in self._line_items(input_source.input_bytes)]
+        return SimpleNamespace(document=SimpleNamespace(
+            inference=SimpleNamespace(prediction=SimpleNamespace(line_items=line_items))
+        ))
+
+
+class RecordingModel:
+    """Passes calls through to a real Gemini model and saves its answers to a Cassette.
+
+    A streamed answer is saved only once the stream has been read to the
+    end; ``unsaved`` counts the streams that were abandoned or failed part
+    way, whose partial text is left out of the cassette.
+    """
+
+    def __init__(self, model, cassette):
+        self.model = model
+        self.cassette = cassette
+        self.unsaved = 0
+
+    def generate_content(self, prompt, stream=False):
+        response = self.model.generate_content(prompt, stream=stream)
+        if stream:
+            return self._record_stream(prompt, response)
+        try:
+            self.cassette.put("gemini", prompt, response.text)
+        except ValueError:
+            # Blocked responses have no text; there is nothing to replay
+            pass
+        return response
+
+    def _record_stream(self, prompt, chunks):
+        text, completed = "", False
+        try:
+            for chunk in chunks:
+                try:
+                    text += chunk.text
+                except ValueError:
+                    pass
+                yield chunk
+            completed = True
+        finally:
+            # Also runs when the caller drops the stream (a fragment rerun or a page switch closes it)
+            if completed:
+                self.cassette.put("gemini", prompt, text)
+            else:
+                self.unsaved += 1
+
+
+class RecordingMindee:
+    """Passes calls through to a real Mindee client and saves the line items to a Cassette"""
+
+    def __init__(self, client, cassette):
+        self.client = client
+        self.cassette = cassette
+
+    def source_from_bytes(self, input_bytes, filename):
+        return SimpleNamespace(source=self.client.source_from_bytes(input_bytes, filename),
+                               key=hashlib.sha256(input_bytes).hexdigest())
+
+    def parse(self, product_class, input_source):
+        result = self.client.parse(product_class, input_source.source)
+        line_items = result.document.inference.prediction.line_items
+        self.cassette.put("mindee", input_source.key,
+                          [(item.description, item.total_amount) for item in line_items])
+        return result
@@ -0,0 +1,12 @@
+"""Vectorized dashboard filters"""
+import numpy as np
+
+
+def transaction_mask(df, want_need=None, categories=None):
+    """Boolean array selecting rows whose labels are in the given selections; None or empty keeps all"""
+    mask = np.ones(len(df), dtype=bool)
+    if want_need:
+        mask &= df["Want or Need"].isin(want_need).to_numpy()
+    if categories:
+        mask &= df["Category"].isin(categories).to_numpy()
+    return mask
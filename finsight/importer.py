@@ -0,0 +1,283 @@
+"""Bulk import of transaction history from bank CSV and OFX/QFX exports.
+
+Files are read in chunks, so memory stays bounded by the chunk size
+rather than the file size. Each row gets a fingerprint from its date,
+amount and description (or the bank's own FITID), so importing the same
+or an overlapping export again only adds the rows not already stored.
+Rows are categorized a chunk at a time with the keyword rules and the
+local classifier; nothing is sent to Gemini.
+"""
+import codecs
+import io
+import re
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from finsight.categorize import CATEGORIES, DEFAULT_WANT_NEED, WANT_NEED, categorize_series_by_keywords
+
+# Rows read, categorized and written at a time
+CHUNK_SIZE = 50_000
+
+# Rows read up front to guess the column mapping and date format
+SAMPLE_ROWS = 200
+
+# Header names banks commonly use for each column, checked in order
+COLUMN_GUESSES = {
+    "Name": ["name", "description", "payee", "merchant", "memo", "details", "transaction"],
+    "Price": ["price", "amount", "debit", "withdrawal", "value"],
+    "Date": ["date", "transaction date", "posted date", "posting date", "trans. date"],
+    "Category": ["category"],
+    "Want or Need": ["want or need", "want/need"],
+}
+
+# Date formats banks export, tried in order; month-first before day-first as most exports are US
+DATE_FORMATS = [
+    "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%m/%d/%y", "%d/%m/%y", "%Y/%m/%d", "%m-%d-%Y", "%d-%m-%Y",
+    "%d.%m.%Y", "%Y%m%d", "%d %b %Y", "%b %d, %Y", "%Y-%m-%dT%H:%M:%S", "%m/%d/%Y %H:%M",
+]
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.DOTALL | re.IGNORECASE)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+@dataclass
+class ImportReport:
+    """Outcome of importing one file"""
+    rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    unreadable: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def file_kind(filename):
+    """"ofx" for OFX/QFX exports, "csv" for anything else"""
+    return "ofx" if filename.lower().endswith((".ofx", ".qfx")) else "csv"
+
+
+def guess_columns(columns):
+    """Best guess at {schema column: file column} from a CSV header; unmatched columns map to None"""
+    lowered = {str(column).strip().lower(): column for column in columns}
+    mapping = {}
+    for field, candidates in COLUMN_GUESSES.items():
+        mapping[field] = next((lowered[name] for name in candidates if name in lowered), None)
+        if mapping[field] is None and field in ("Name", "Price", "Date"):
+            # Fall back to a header that merely contains the word, e.g. "Transaction Amount"
+            mapping[field] = next(
+                (original for name, original in lowered.items() if any(word in name for word in candidates[:2])),
+                None,
+            )
+    return mapping
+
+
+def guess_date_format(values):
+    """First of DATE_FORMATS that reads every non-empty value in a sample, or None if none does"""
+    values = values.dropna().astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return None
+    return next(
+        (date_format for date_format in DATE_FORMATS
+         if pd.to_datetime(values, format=date_format, errors="coerce").notna().all()),
+        None,
+    )
+
+
+def check_mapping(mapping):
+    """Raise ValueError unless ``mapping`` sets Name, Price and Date and uses each file column once"""
+    missing = [field for field in ("Name", "Price", "Date") if not mapping.get(field)]
+    if missing:
+        raise ValueError(f"Choose the file columns for: {', '.join(missing)}")
+    fields = {}
+    for field, source in mapping.items():
+        if source is not None:
+            fields.setdefault(source, []).append(field)
+    repeated = [f"{source!r} ({' and '.join(names)})" for source, names in fields.items() if len(names) > 1]
+    if repeated:
+        raise ValueError(f"Each file column can only be used once: {', '.join(repeated)}")
+
+
+def read_csv_chunks(file, mapping, chunksize=CHUNK_SIZE):
+    """Yield frames of Name/Amount/Date (plus any mapped labels) from a CSV file object"""
+    columns = {source: field for field, source in mapping.items() if source is not None}
+    reader = pd.read_csv(file, usecols=list(columns), dtype=str, chunksize=chunksize, skipinitialspace=True)
+    for chunk in reader:
+        chunk = chunk.rename(columns=columns).rename(columns={"Price": "Amount"})
+        yield chunk
+
+
+def read_ofx_chunks(file, chunksize=CHUNK_SIZE):
+    """Yield frames of Name/Amount/Date/FITID from an OFX or QFX file object, a block at a time"""
+    decoder = codecs.getincrementaldecoder("latin-1")()
+    buffer, rows = "", []
+    for block in iter(lambda: file.read(1 << 20), b""):
+        buffer += decoder.decode(block)
+        end = 0
+        for match in _OFX_TRANSACTION.finditer(buffer):
+            fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(match.group(1))}
+            rows.append((
+                fields.get("NAME") or fields.get("MEMO") or "",
+                fields.get("TRNAMT"),
+                (fields.get("DTPOSTED") or "")[:8],
+                fields.get("FITID"),
+            ))
+            end = match.end()
+        # Keep any partial transaction for the next block
+        buffer = buffer[end:]
+        while len(rows) >= chunksize:
+            yield pd.DataFrame(rows[:chunksize], columns=["Name", "Amount", "Date", "FITID"])
+            del rows[:chunksize]
+    if rows:
+        yield pd.DataFrame(rows, columns=["Name", "Amount", "Date", "FITID"])
+
+
+def _amounts(values):
+    # Strip currency symbols and thousands separators; "(12.50)" is accounting notation for -12.50
+    text = values.fillna("").astype(str).str.strip()
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    amounts = pd.to_numeric(text.str.replace(r"[^\d.\-]", "", regex=True), errors="coerce")
+    return amounts.where(~negative, -amounts.abs())
+
+
+def spending_is_negative(values):
+    """Whether most amounts in a sample are negative, i.e. the export shows spending as debits"""
+    amounts = _amounts(values)
+    return bool((amounts < 0).sum() >= (amounts > 0).sum())
+
+
+def prepare_chunk(raw, negative_spending=True, classifier=None, date_format=None):
+    """Clean a raw chunk into stored COLUMNS plus a base fingerprint.
+
+    Dates are read with ``date_format`` (see guess_date_format), or
+    guessed by pandas per chunk when it is None. Returns (frame, rows that
+    are not spending, rows whose date or amount could not be read).
+    """
+    amounts = _amounts(raw["Amount"])
+    if negative_spending:
+        amounts = -amounts
+    dates = pd.to_datetime(raw["Date"], format=date_format, errors="coerce")
+    # Only spending is tracked: credits, payments and unreadable rows are left out
+    readable = amounts.notna() & dates.notna()
+    keep = readable & (amounts > 0)
+    frame = pd.DataFrame({
+        "Name": raw["Name"].fillna("").astype(str).str.strip()[keep],
+        "Price": amounts[keep].round(2),
+        "Date": dates[keep].dt.strftime("%Y-%m-%d"),
+    })
+
+    category = raw["Category"][keep] if "Category" in raw else None
+    if category is not None and category.isin(CATEGORIES).all():
+        frame["Category"] = category
+    else:
+        frame["Category"] = categorize_series_by_keywords(frame["Name"])
+        if category is not None:
+            frame["Category"] = category.where(category.isin(CATEGORIES), frame["Category"])
+    frame["Want or Need"] = frame["Category"].map(DEFAULT_WANT_NEED).fillna("Need")
+    if "Want or Need" in raw:
+        given = raw["Want or Need"][keep]
+        frame["Want or Need"] = given.where(given.isin(WANT_NEED), frame["Want or Need"])
+
+    if classifier is not None and len(frame):
+        # The classifier has learned the user's own corrections, so its confident answers win
+        codes, names = pd.factorize(frame["Name"])
+        guesses = classifier.predict_many(names)
+        confident = np.array([guess[2] >= classifier.min_confidence for guess in guesses])
+        if confident.any():
+            pick = confident[codes]
+            frame.loc[pick, "Category"] = np.array([guess[0] for guess in guesses], dtype=object)[codes][pick]
+            frame.loc[pick, "Want or Need"] = np.array([guess[1] for guess in guesses], dtype=object)[codes][pick]
+
+    # The bank's own transaction id is the best identity when there is one
+    identity = raw["FITID"][keep].fillna("") if "FITID" in raw else ""
+    key = pd.DataFrame({
+        "date": frame["Date"],
+        "cents": (frame["Price"] * 100).round().astype("int64"),
+        "name": frame["Name"].str.lower().str.replace(r"\s+", " ", regex=True),
+        "id": identity,
+    })
+    frame["Base"] = pd.util.hash_pandas_object(key, index=False).to_numpy()
+    return frame, int((readable & ~keep).sum()), int((~readable).sum())
+
+
+def fingerprint(frame, carried):
+    """Give each row a fingerprint, numbering repeats of the same base so genuine duplicates survive.
+
+    Two identical coffees on the same day are two transactions; the
+    occurrence number tells them apart while staying stable across
+    re-imports. ``carried`` holds {base: (count, date)} from earlier
+    chunks, so repeats split across chunk boundaries, even with other
+    rows in between, are numbered correctly in date-ordered exports.
+    Returns the counts to carry into the next chunk.
+    """
+    base = pd.Series(frame["Base"].to_numpy(), index=frame.index)
+    previous = base.map({key: count for key, (count, _) in carried.items()}).fillna(0).astype("int64")
+    occurrence = base.groupby(base).cumcount() + previous
+    hashed = pd.util.hash_pandas_object(pd.DataFrame({"base": base, "occurrence": occurrence}), index=False)
+    # SQLite integers are signed 64-bit
+    frame["Fingerprint"] = hashed.to_numpy().view(np.int64).tolist()
+    if frame.empty:
+        return carried
+    dates = pd.Series(frame["Date"].to_numpy(), index=frame.index)
+    counts = pd.DataFrame({"count": occurrence + 1, "date": dates}).groupby(base).agg({"count": "max", "date": "first"})
+    carried = {**carried, **dict(zip(counts.index, zip(counts["count"].tolist(), counts["date"])))}
+    # A date-ordered export never returns to a date outside this chunk's range, in either direction
+    first, last = frame["Date"].min(), frame["Date"].max()
+    return {key: (count, day) for key, (count, day) in carried.items() if first <= day <= last}
+
+
+def import_transactions(store, file, filename, batch_id, mapping=None, negative_spending=True,
+                        classifier=None, chunksize=CHUNK_SIZE, progress=None, date_format=None):
+    """Stream a CSV or OFX/QFX export into ``store``, calling ``progress(report)`` after each chunk.
+
+    ``mapping`` is {schema column: CSV column}, guessed from the header if
+    omitted; it is ignored for OFX. ``date_format`` is a strptime format
+    used for every chunk, guessed from the first rows if omitted. Amounts
+    are spending when negative if ``negative_spending`` (always the case
+    in OFX). Returns an ImportReport.
+    """
+    began = time.perf_counter()
+    report = ImportReport()
+    if file_kind(filename) == "ofx":
+        chunks, negative_spending, date_format = read_ofx_chunks(file, chunksize), True, "%Y%m%d"
+    else:
+        if mapping is None or date_format is None:
+            sample = sample_columns(file, rows=SAMPLE_ROWS)
+            mapping = mapping or guess_columns(sample.columns)
+            if date_format is None and mapping.get("Date") in sample:
+                date_format = guess_date_format(sample[mapping["Date"]])
+        check_mapping(mapping)
+        chunks = read_csv_chunks(file, mapping, chunksize)
+
+    carried = {}
+    for raw in chunks:
+        frame, skipped, unreadable = prepare_chunk(raw, negative_spending, classifier, date_format)
+        carried = fingerprint(frame, carried)
+        imported = store.import_rows(batch_id, frame) if len(frame) else 0
+        report.rows += len(raw)
+        report.skipped += skipped
+        report.unreadable += unreadable
+        report.imported += imported
+        report.duplicates += len(frame) - imported
+        report.seconds = time.perf_counter() - began
+        if progress is not None:
+            progress(report)
+    return report
+
+
+def sample_columns(file, rows=5):
+    """Header and first rows of a CSV file object, for choosing a column mapping and date format"""
+    data = file.read(64 * 1024)
+    if len(data) == 64 * 1024:
+        # Leave out the row the read cut in half
+        data = data[:data.rfind(b"\n") + 1] or data
+    sample = pd.read_csv(io.BytesIO(data), nrows=rows, dtype=str, on_bad_lines="skip")
+    file.seek(0)
+    return sample
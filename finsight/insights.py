@@ -0,0 +1,159 @@
+"""Spending summaries and AI insight generation"""
+import hashlib
+
+from finsight import tracing
+
+# Rough characters per token for English text and numbers
+CHARS_PER_TOKEN = 4
+TOKEN_BUDGET = 1500
+
+SECTIONS = ["🔑 Key Insights", "📊 Spending Patterns", "💰 Potential Savings", "📚 Smart Spending Tips"]
+
+
+def _money(value):
+    return f"${value:,.2f}"
+
+
+def _summary_text(df, months, top_items):
+    lines = []
+    total = df["Price"].sum()
+    lines.append(
+        f"{len(df)} items from {df['Date'].min():%Y-%m-%d} to {df['Date'].max():%Y-%m-%d}, total {_money(total)}"
+    )
+
+    split = df.groupby("Want or Need", observed=False)["Price"].sum()
+    lines.append("Want/need split: " + ", ".join(
+        f"{kind} {_money(amount)} ({amount / total:.0%})" for kind, amount in split.items() if total
+    ))
+
+    by_month = df.pivot_table(
+        index=df["Date"].dt.to_period("M"), columns="Category", values="Price",
+        aggfunc="sum", fill_value=0, observed=False,
+    ).sort_index().tail(months)
+    lines.append("Monthly spending by category:")
+    for month, row in by_month.iterrows():
+        parts = ", ".join(f"{category} {_money(amount)}" for category, amount in row.items() if amount)
+        lines.append(f"- {month}: {_money(row.sum())} ({parts})")
+
+    if len(by_month) >= 2:
+        change = by_month.iloc[-1] - by_month.iloc[-2]
+        moves = ", ".join(f"{category} {amount:+,.2f}" for category, amount in change.items() if amount)
+        lines.append(f"Change {by_month.index[-2]} -> {by_month.index[-1]}: {moves or 'none'}")
+
+    items = df.assign(Item=df["Name"].str.strip().str.upper()).groupby("Item").agg(
+        spent=("Price", "sum"), bought=("Price", "size"), category=("Category", "first"),
+    ).nlargest(top_items, "spent")
+    lines.append("Top items by spending:")
+    for name, row in items.iterrows():
+        lines.append(f"- {name} ({row['category']}): {_money(row['spent'])} over {row['bought']} purchases")
+    return "\n".join(lines)
+
+
+def build_summary(df, token_budget=TOKEN_BUDGET):
+    """Compact text summary of a transactions DataFrame that fits in ``token_budget`` tokens.
+
+    Covers totals, the want/need split, per-category monthly totals, the
+    latest month-over-month change and top items, trimming the history and
+    item list until it fits.
+    """
+    if df.empty:
+        return "No transactions recorded."
+    months, top_items = 12, 10
+    text = _summary_text(df, months, top_items)
+    while len(text) > token_budget * CHARS_PER_TOKEN and (months > 2 or top_items > 3):
+        if months > 2:
+            months -= 2
+        else:
+            top_items -= 1
+        text = _summary_text(df, months, top_items)
+    return text[:token_budget * CHARS_PER_TOKEN]
+
+
+def insights_prompt(summary):
+    """Prompt asking for the four insight sections of the Smart Insights page"""
+    return f"""
+    Analyze this spending summary and provide concise, actionable insights in markdown format:
+    {summary}
+
+    Format your response as follows:
+
+    # 🔑 Key Insights
+    [Provide 2-3 most important points in bullet points]
+
+    # 📊 Spending Patterns
+    [3-4 bullet points about spending habits]
+
+    # 💰 Potential Savings
+    [3-4 specific areas where money can be saved]
+
+    # 📚 Smart Spending Tips
+    [3-4 actionable tips]
+
+    Keep each bullet point extremely concise (max 1 line).
+    Total reading time should be under 2.5 minutes.
+    Use emojis and markdown formatting for better readability.
+    """
+
+
+def parse_sections(text):
+    """Split a markdown response into {header: content} on top-level '#' headings"""
+    sections = {}
+    for section in text.split("#")[1:]:
+        header, _, content = section.partition("\n")
+        if header.strip():
+            sections[header.strip()] = content.strip()
+    return sections
+
+
+def stream_insights(model, prompt, cache=None):
+    """Yield the response text generated so far for ``prompt``.
+
+    Responses are cached by a hash of the prompt, which is built from the
+    data summary, so unchanged data is answered from ``cache`` (a
+    ResultCache) in one step without calling the model.
+    """
+    key = "insights:" + hashlib.sha256(prompt.encode()).hexdigest()
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        tracing.count("insights.cache_hits")
+        yield cached
+        return
+
+    text = ""
+    with tracing.span("llm.insights") as span:
+        response = model.generate_content(prompt, stream=True)
+        for chunk in response:
+            try:
+                text += chunk.text
+            except ValueError:
+                # Chunks without text (e.g. safety metadata) carry nothing to show
+                continue
+            yield text
+        prompt_tokens, response_tokens = tracing.token_usage(response, prompt, text)
+        span.set(prompt_tokens=prompt_tokens, response_tokens=response_tokens)
+    if cache is not None and text:
+        cache.put(key, text)
+
+
+def generate_insights(model, prompt, cache=None):
+    """Complete response text for ``prompt``, using the same cache as stream_insights"""
+    text = ""
+    for text in stream_insights(model, prompt, cache):
+        pass
+    return text
+
+
+def get_ai_insights(model, df, cache=None):
+    """Short savings and education tips for a transactions DataFrame"""
+    prompt = f"""
+    Make sure the points you make dont go more than 2 paragraphs. combined. Analyze this spending summary and provide small categorized bulleted insights:
+    {build_summary(df)}
+
+    Provide short bulleted points on:
+    1. Potential Savings
+    2. Educational Tips
+    """
+    try:
+        return generate_insights(model, prompt, cache)
+    except Exception:
+        return "Unable to generate insights at this time."
@@ -0,0 +1,180 @@
+"""Background receipt processing with a persistent job table"""
+import json
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from finsight.pipeline import image_key
+
+QUEUED, OCR, CATEGORIZING, DONE, FAILED = "queued", "ocr", "categorizing", "done", "failed"
+ACTIVE = (QUEUED, OCR, CATEGORIZING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    summary TEXT,
+    image BLOB,
+    not_before REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+
+@dataclass
+class Job:
+    """Current state of one receipt job"""
+    id: str
+    filename: str
+    status: str
+    attempts: int
+    error: str
+    summary: dict
+    updated_at: float
+
+
+class JobQueue:
+    """Process-wide worker threads draining a SQLite table of receipt jobs.
+
+    Jobs are keyed by the image hash, so submitting the same image twice
+    is a no-op. Each job moves through queued -> ocr -> categorizing ->
+    done, or to failed once ``max_attempts`` retryable failures have
+    passed; retries back off exponentially with jitter. A failed job is
+    only queued again by ``retry``. Finished receipts are appended to
+    ``store``. Jobs interrupted by a restart are picked
+    up again when the queue is next created.
+    """
+
+    def __init__(self, path, pipeline, store, workers=4, max_attempts=3, retry_delay=2.0):
+        self.pipeline = pipeline
+        self.store = store
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._stopped = False
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(
+                "UPDATE jobs SET status = ? WHERE status IN (?, ?)", (QUEUED, OCR, CATEGORIZING)
+            )
+        self._threads = [
+            threading.Thread(target=self._work, name=f"receipt-job-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, image_bytes, filename):
+        """Queue an image for processing and return its job id; an image seen before keeps its job"""
+        job_id = image_key(image_bytes)
+        now = time.time()
+        with self._lock, self._conn:
+            created = self._conn.execute("""
+                INSERT INTO jobs (id, filename, status, image, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO NOTHING
+            """, (job_id, filename, QUEUED, image_bytes, now, now)).rowcount
+        if created:
+            with self._wake:
+                self._wake.notify()
+        return job_id
+
+    def retry(self, job_id):
+        """Queue a failed job again with a fresh set of attempts; returns whether it was requeued"""
+        with self._lock, self._conn:
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, error = NULL, not_before = 0, updated_at = ?"
+                " WHERE id = ? AND status = ? AND image IS NOT NULL",
+                (QUEUED, time.time(), job_id, FAILED),
+            ).rowcount
+        if requeued:
+            with self._wake:
+                self._wake.notify()
+        return bool(requeued)
+
+    def jobs(self, ids):
+        """{job id: Job} for the given ids that exist"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, filename, status, attempts, error, summary, updated_at FROM jobs"
+                f" WHERE id IN ({', '.join('?' * len(ids))})",
+                ids,
+            ).fetchall()
+        return {row[0]: Job(*row[:5], json.loads(row[5]) if row[5] else {}, row[6]) for row in rows}
+
+    def close(self):
+        """Stop the workers after their current job"""
+        self._stopped = True
+        with self._wake:
+            self._wake.notify_all()
+
+    def _set(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self):
+        """Mark the oldest runnable job as started and return (id, filename, image, attempts)"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, filename, image, attempts FROM jobs"
+                " WHERE status = ? AND not_before <= ? ORDER BY created_at LIMIT 1",
+                (QUEUED, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (OCR, time.time(), row[0]),
+            )
+        return row[0], row[1], row[2], row[3] + 1
+
+    def _work(self):
+        while not self._stopped:
+            job = self._claim()
+            if job is None:
+                # Woken early by submit(); the timeout picks up retries whose delay has passed
+                with self._wake:
+                    self._wake.wait(timeout=0.5)
+                continue
+            try:
+                self._run(*job)
+            except Exception as e:
+                self._set(job[0], status=FAILED, error=f"Error processing receipt: {str(e)}")
+
+    def _run(self, job_id, filename, image_bytes, attempts):
+        def report(stage):
+            if stage == "categorize":
+                self._set(job_id, status=CATEGORIZING)
+
+        result = self.pipeline.process(image_bytes, filename, report)
+        if result.error:
+            if result.retryable and attempts < self.max_attempts:
+                delay = self.retry_delay * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+                self._set(job_id, status=QUEUED, error=result.error, not_before=time.time() + delay)
+            else:
+                self._set(job_id, status=FAILED, error=result.error)
+            return
+
+        self.store.append_batch(job_id, result.items)
+        summary = {"items": len(result.items), "seconds": result.seconds, "cached": result.cached}
+        if result.preprocess:
+            summary.update(bytes_in=result.preprocess.bytes_in, bytes_out=result.preprocess.bytes_out)
+        if result.categorization:
+            stats = result.categorization
+            summary.update(ai_calls=stats.calls, ai_seconds=stats.seconds,
+                           from_cache=stats.cached, by_classifier=stats.local, by_keyword=stats.fallbacks)
+        # The image is no longer needed once its items are stored
+        self._set(job_id, status=DONE, error=None, summary=json.dumps(summary), image=None)
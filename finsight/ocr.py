@@ -0,0 +1,28 @@
+"""Receipt OCR"""
+from datetime import date
+
+from finsight import tracing
+
+
+def process_receipt(client, image_bytes, filename="receipt.jpg"):
+    """Extract line items from receipt image bytes using Mindee OCR"""
+    from mindee import product
+
+    # Process the image with Mindee straight from memory
+    input_doc = client.source_from_bytes(image_bytes, filename)
+    with tracing.span("ocr.mindee", bytes=len(image_bytes)) as span:
+        result = client.parse(product.ReceiptV5, input_doc)
+        products = result.document.inference.prediction.line_items
+        span.set(items=len(products))
+
+    # Extract items and prices
+    return [
+        {
+            "Name": item.description,
+            "Price": item.total_amount,
+            "Date": date.today(),
+            "Category": "Other",
+            "Want or Need": "Need",
+        }
+        for item in products
+    ]
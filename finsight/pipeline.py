@@ -0,0 +1,136 @@
+"""Concurrent receipt processing: preprocessing, OCR and categorization"""
+import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+
+from finsight import tracing
+from finsight.categorize import categorize_batch
+from finsight.clients import is_retryable
+from finsight.ocr import process_receipt
+from finsight.preprocess import preprocess_image
+
+# Stages reported for each receipt, in order
+STAGES = ["queued", "preprocess", "ocr", "categorize", "done"]
+
+
+@dataclass
+class ReceiptResult:
+    """Outcome of processing one receipt image"""
+    key: str
+    filename: str
+    items: list = None
+    receipt: list = None
+    preprocess: object = None
+    categorization: object = None
+    cached: bool = False
+    error: str = None
+    retryable: bool = False
+    seconds: float = 0.0
+
+
+@dataclass
+class PipelineEvent:
+    """A receipt reaching ``stage``; ``result`` is set once it is done or failed"""
+    key: str
+    filename: str
+    stage: str
+    result: ReceiptResult = None
+
+
+def image_key(image_bytes):
+    """Content hash identifying a receipt image"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+class ReceiptPipeline:
+    """Processes receipt images on a thread pool with per-provider concurrency limits.
+
+    At most ``ocr_concurrency`` Mindee calls and ``llm_concurrency`` Gemini
+    calls run at once across everything submitted to the pipeline, so one
+    receipt's OCR overlaps another's categorization without exceeding
+    provider quotas. ``ocr_client`` and ``model`` can be the fakes from
+    finsight.fakes for offline runs; ``classifier`` answers the items it
+    is confident about without a model call.
+    """
+
+    def __init__(self, ocr_client, model, category_cache=None, ingest_cache=None, classifier=None,
+                 max_workers=8, ocr_concurrency=4, llm_concurrency=4):
+        self.ocr_client = ocr_client
+        self.model = model
+        self.category_cache = category_cache
+        self.classifier = classifier
+        self.ingest_cache = ingest_cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="receipt")
+        self._ocr_slots = threading.BoundedSemaphore(ocr_concurrency)
+        self._llm_slots = threading.BoundedSemaphore(llm_concurrency)
+
+    def process(self, image_bytes, filename, report=None):
+        """Run one receipt through the pipeline, calling ``report(stage)`` as it progresses"""
+        report = report or (lambda stage: None)
+        began = time.perf_counter()
+        result = ReceiptResult(key=image_key(image_bytes), filename=filename)
+        try:
+            cached = self.ingest_cache.get(result.key) if self.ingest_cache is not None else None
+            if cached is not None:
+                result.items, result.cached = cached["items"], True
+                for item in result.items:
+                    item["Date"] = date.fromisoformat(item["Date"])
+                return result
+
+            # Smaller grayscale uploads are faster for Mindee and read just as well
+            report("preprocess")
+            with tracing.span("receipt.preprocess"):
+                prepared, result.preprocess = preprocess_image(image_bytes)
+            report("ocr")
+            with self._ocr_slots:
+                result.receipt = process_receipt(
+                    self.ocr_client, prepared, "receipt.jpg" if prepared is not image_bytes else filename
+                )
+            if not result.receipt:
+                result.error = "No items found in the receipt. Please try again with a clearer image."
+                return result
+
+            # Categorization mutates the items, so keep a copy of the raw OCR output
+            report("categorize")
+            result.items = [item.copy() for item in result.receipt]
+            with self._llm_slots:
+                result.categorization = categorize_batch(
+                    result.items, self.model, cache=self.category_cache, classifier=self.classifier
+                )
+            if self.ingest_cache is not None:
+                self.ingest_cache.put(result.key, {"receipt": result.receipt, "items": result.items})
+            return result
+        except Exception as e:
+            # Provider overload and network errors are worth another try; bad requests, bad keys and bugs are not
+            result.error = f"Error processing receipt: {str(e)}"
+            result.retryable = is_retryable(e)
+            return result
+        finally:
+            result.seconds = time.perf_counter() - began
+
+    def process_many(self, uploads):
+        """Process (image_bytes, filename) pairs concurrently, yielding PipelineEvents as they happen"""
+        events = queue.Queue()
+        pending = 0
+        for image_bytes, filename in uploads:
+            key = image_key(image_bytes)
+            events.put(PipelineEvent(key, filename, "queued"))
+
+            def run(image_bytes=image_bytes, filename=filename, key=key):
+                result = self.process(
+                    image_bytes, filename, lambda stage: events.put(PipelineEvent(key, filename, stage))
+                )
+                events.put(PipelineEvent(key, filename, "failed" if result.error else "done", result))
+
+            self._executor.submit(run)
+            pending += 1
+
+        while pending:
+            event = events.get()
+            if event.result is not None:
+                pending -= 1
+            yield event
@@ -0,0 +1,99 @@
+"""Shrink receipt photos before they are sent for OCR"""
+import io
+import time
+from dataclasses import dataclass, field
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps, UnidentifiedImageError
+
+# Longest side kept for OCR; receipt text stays legible well below phone camera resolution
+MAX_SIDE = 1600
+JPEG_QUALITY = 80
+
+# How far a pixel must differ from the background to count as part of the receipt
+CROP_THRESHOLD = 40
+CROP_MARGIN = 0.02
+
+
+@dataclass
+class PreprocessReport:
+    """Size and per-stage timing of one preprocessed image"""
+    bytes_in: int
+    bytes_out: int = 0
+    stages: dict = field(default_factory=dict)
+
+    @property
+    def seconds(self):
+        return sum(self.stages.values())
+
+
+def _content_box(gray):
+    """Bounding box of everything that stands out from the image border, or None"""
+    width, height = gray.size
+    # Find the box on a small copy; a median filter drops speckle that would stretch it
+    small = gray.copy()
+    small.thumbnail((400, 400))
+    scale_x, scale_y = width / small.width, height / small.height
+    border = [small.getpixel((x, y)) for x in (0, small.width - 1) for y in (0, small.height - 1)]
+    background = sorted(border)[len(border) // 2]
+    mask = ImageChops.difference(small, Image.new("L", small.size, background))
+    mask = mask.point(lambda value: 255 if value > CROP_THRESHOLD else 0).filter(ImageFilter.MedianFilter(3))
+    box = mask.getbbox()
+    if not box:
+        return None
+    left, top, right, bottom = box
+    # Ignore boxes that are implausibly small; the photo is probably mostly receipt already
+    if (right - left) * (bottom - top) < 0.2 * small.width * small.height:
+        return None
+    pad_x, pad_y = int(width * CROP_MARGIN), int(height * CROP_MARGIN)
+    return (
+        max(int(left * scale_x) - pad_x, 0),
+        max(int(top * scale_y) - pad_y, 0),
+        min(int(right * scale_x) + pad_x, width),
+        min(int(bottom * scale_y) + pad_y, height),
+    )
+
+
+def preprocess_image(image_bytes, max_side=MAX_SIDE, quality=JPEG_QUALITY):
+    """Orient, grayscale, crop, downsample and re-encode a receipt photo.
+
+    Returns (jpeg_bytes, PreprocessReport). Images Pillow cannot read, or
+    that would not get smaller, are returned unchanged.
+    """
+    report = PreprocessReport(bytes_in=len(image_bytes))
+
+    def stage(name, func, value):
+        began = time.perf_counter()
+        result = func(value)
+        report.stages[name] = time.perf_counter() - began
+        return result
+
+    def decode(data):
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        return img
+
+    try:
+        image = stage("decode", decode, image_bytes)
+        image = stage("orient", ImageOps.exif_transpose, image)
+    except (UnidentifiedImageError, OSError):
+        report.bytes_out = len(image_bytes)
+        return image_bytes, report
+
+    image = stage("grayscale", lambda img: img.convert("L"), image)
+    image = stage("crop", lambda img: img.crop(_content_box(img) or (0, 0) + img.size), image)
+
+    def downsample(img):
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        return img
+    image = stage("resize", downsample, image)
+
+    def encode(img):
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+        return buffer.getvalue()
+    output = stage("encode", encode, image)
+
+    if len(output) >= len(image_bytes):
+        output = image_bytes
+    report.bytes_out = len(output)
+    return output, report
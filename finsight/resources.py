@@ -0,0 +1,152 @@
+"""Process-wide resources shared by every Streamlit session"""
+import os
+
+import streamlit as st
+
+from finsight import tracing
+from finsight.analytics import SpendingIndex
+from finsight.cache import CategoryCache, ResultCache
+from finsight.charts import by_category, daily_frame, over_time, select_daily
+from finsight.classifier import ItemClassifier, train_from_cache
+from finsight.clients import GeminiClient, MindeeClient, make_gemini_model, make_mindee_client
+from finsight.config import data_path
+from finsight.filters import transaction_mask
+from finsight.insights import TOKEN_BUDGET, build_summary
+from finsight.jobs import JobQueue
+from finsight.pipeline import ReceiptPipeline
+from finsight.storage import TransactionStore
+
+
+@st.cache_resource
+def get_gemini_model():
+    """Gemini model shared by every session, configured on first use.
+
+    Calls are paced to the account quota, retried on transient errors and
+    merged with identical calls from other sessions.
+    """
+    return GeminiClient(make_gemini_model())
+
+
+@st.cache_resource
+def get_mindee_client():
+    """Mindee client shared by every session, created on first use and paced to the quota"""
+    return MindeeClient(make_mindee_client())
+
+
+@st.cache_resource
+def get_store():
+    """Transactions shared by every session and kept across restarts"""
+    return TransactionStore(data_path("finsight.db"))
+
+
+@st.cache_resource(max_entries=2)
+def _transactions(version):
+    return get_store().query()
+
+
+def get_transactions():
+    """Every stored transaction as one typed DataFrame, reloaded only after writes.
+
+    The frame is shared between sessions; callers must not modify it.
+    """
+    return _transactions(get_store().version)
+
+
+@st.cache_data(max_entries=64)
+def _filter_mask(version, want_need, categories):
+    return transaction_mask(_transactions(version), want_need, categories)
+
+
+def filter_transactions(want_need=None, categories=None):
+    """Stored transactions matching the dashboard filter selections"""
+    with tracing.span("dataframe.filter") as span:
+        version = get_store().version
+        want_need = tuple(want_need or ())
+        categories = tuple(categories or ())
+        df = _transactions(version)[_filter_mask(version, want_need, categories)]
+        span.set(rows=len(df))
+    return df
+
+
+@st.cache_resource(max_entries=2)
+def _daily(version):
+    return daily_frame(get_store().daily_totals())
+
+
+@st.cache_data(max_entries=64)
+def _chart_data(version, want_need, categories, frequency):
+    daily = select_daily(_daily(version), want_need, categories)
+    return {
+        "by_category": by_category(daily),
+        "by_period": over_time(daily, "Category", frequency),
+        "want_need": over_time(daily, "Want or Need", frequency),
+    }
+
+
+def get_chart_data(want_need=None, categories=None, frequency="Month"):
+    """Aggregated dashboard chart buckets for the filter selections, rebuilt only after writes"""
+    with tracing.span("charts.aggregate"):
+        return _chart_data(get_store().version, tuple(want_need or ()), tuple(categories or ()), frequency)
+
+
+@st.cache_resource
+def _spending_index():
+    return SpendingIndex(get_store())
+
+
+def get_spending_index():
+    """Range totals over the store, brought up to date with any writes since the last call"""
+    with tracing.span("stats.index_sync"):
+        return _spending_index().sync()
+
+
+@st.cache_resource
+def get_category_cache():
+    """Item categorizations shared by every session"""
+    return CategoryCache(data_path("categories.db"))
+
+
+@st.cache_resource
+def get_classifier():
+    """Local item classifier shared by every session, trained from the category cache the first time"""
+    path = data_path("classifier.npz")
+    classifier = ItemClassifier.load(path)
+    if not os.path.exists(path):
+        train_from_cache(classifier, get_category_cache())
+    return classifier
+
+
+@st.cache_resource
+def get_ingest_cache():
+    """OCR and categorization results keyed by the SHA-256 of the receipt image"""
+    return ResultCache(data_path("receipts.db"))
+
+
+@st.cache_resource
+def get_insights_cache():
+    """AI insight responses keyed by a hash of their prompt; refreshed every few hours"""
+    return ResultCache(data_path("insights.db"), ttl=6 * 3600, max_entries=200)
+
+
+@st.cache_data(max_entries=8)
+def _spending_summary(version, token_budget):
+    return build_summary(_transactions(version), token_budget)
+
+
+def get_spending_summary(token_budget=TOKEN_BUDGET):
+    """Prompt-sized summary of every stored transaction, rebuilt only after writes"""
+    return _spending_summary(get_store().version, token_budget)
+
+
+@st.cache_resource
+def get_pipeline():
+    """Receipt pipeline shared by every session, so provider concurrency limits are process-wide"""
+    return ReceiptPipeline(
+        get_mindee_client(), get_gemini_model(), get_category_cache(), get_ingest_cache(), get_classifier()
+    )
+
+
+@st.cache_resource
+def get_job_queue():
+    """Background receipt workers shared by every session; jobs outlive page switches and reruns"""
+    return JobQueue(data_path("jobs.db"), get_pipeline(), get_store())
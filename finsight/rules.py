@@ -0,0 +1,132 @@
+"""Keyword categorization rules, compiled into a single-pass matcher.
+
+Rules live in ``rules.json`` next to this module (override with
+FINSIGHT_RULES). Each rule maps a keyword to a category with a priority;
+when several keywords match a name, the lowest priority number wins, and
+ties go to the rule listed first. ``"match": "substring"`` matches the
+keyword anywhere in the name ("chip" in "CHIPS"), ``"word"`` only as a
+whole word ("tea" but not "steak").
+"""
+import json
+import os
+import re
+
+import pandas as pd
+
+RULES_PATH = os.getenv("FINSIGHT_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json"))
+
+# Category for names no rule matches
+DEFAULT_CATEGORY = "Other"
+
+
+def load_rules(path=RULES_PATH):
+    """Rule dicts from a JSON rule table, validated and ordered by priority"""
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+    for rule in rules:
+        if rule.get("match", "substring") not in ("substring", "word"):
+            raise ValueError(f"Unknown match type in rule {rule}")
+        if not rule.get("keyword") or not rule.get("category"):
+            raise ValueError(f"Rule needs a keyword and a category: {rule}")
+    return sorted(rules, key=lambda rule: rule.get("priority", 0))
+
+
+def _trie_pattern(keywords):
+    """Regex alternation of ``keywords`` factored by shared prefixes, e.g. c(?:andy|hip)"""
+    root = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(root)
+
+
+def _boundary(text, index):
+    """Whether ``\\b`` holds between ``text[index - 1]`` and ``text[index]``"""
+    return bool(re.match(r"\w", text[index])) != bool(re.match(r"\w", text[index - 1]))
+
+
+class KeywordMatcher:
+    """All rules compiled into one regular expression.
+
+    The pattern is a zero-width lookahead tried at every position, so one
+    scan of a name finds every keyword, overlapping ones included. The
+    keywords are factored into a prefix tree so each position costs a
+    character or two rather than one test per keyword.
+
+    At each position the pattern reports the longest whole-word keyword and
+    the longest substring keyword starting there. Every other keyword that
+    matches at that position is a prefix of one of those two, so each
+    reported keyword carries the best rank of the prefixes that match with
+    it, and the position's rank is the better of the two.
+    """
+
+    def __init__(self, rules, default=DEFAULT_CATEGORY):
+        self.default = default
+        ranks = {"word": {}, "substring": {}}
+        for order, rule in enumerate(rules):
+            kind = rule.get("match", "substring")
+            ranks[kind].setdefault(rule["keyword"].lower(), (rule.get("priority", 0), order, rule["category"]))
+        words, substrings = ranks["word"], ranks["substring"]
+        # A shorter whole word inside a longer one only matches if a word boundary follows it there
+        self.word_ranks = {
+            keyword: min(rank for prefix, rank in words.items()
+                         if keyword == prefix or keyword.startswith(prefix) and _boundary(keyword, len(prefix)))
+            for keyword in words
+        }
+        self.substring_ranks = {
+            keyword: min(rank for prefix, rank in substrings.items() if keyword.startswith(prefix))
+            for keyword in substrings
+        }
+        word = rf"\b(?:{_trie_pattern(words)})\b" if words else "(?!)"
+        substring = _trie_pattern(substrings) if substrings else "(?!)"
+        # Group 1 is the word; the substring is group 2 alongside a word, group 3 without one
+        self.pattern = re.compile(f"(?=({word}))(?=({substring})|)|(?=({substring}))")
+
+    def _rank(self, found):
+        word, substring, alone = found
+        ranks = [self.word_ranks[word]] if word else []
+        if substring or alone:
+            ranks.append(self.substring_ranks[substring or alone])
+        return min(ranks)
+
+    def match(self, name):
+        """Category of the highest-priority keyword in ``name``"""
+        best = None
+        for found in self.pattern.findall(str(name).lower()):
+            rank = self._rank(found)
+            if best is None or rank < best:
+                best = rank
+        return best[2] if best else self.default
+
+    def match_series(self, names):
+        """Categories for a Series of names, scanning each distinct name once"""
+        codes, uniques = pd.factorize(names.fillna("").astype(str).str.lower())
+        found = pd.Series(uniques, dtype=object).str.findall(self.pattern).explode().dropna()
+        ranks = pd.DataFrame([self._rank(match) for match in found], index=found.index,
+                             columns=["priority", "order", "category"])
+        best = ranks.sort_values(["priority", "order"], kind="stable")
+        best = best[~best.index.duplicated()]["category"]
+        categories = best.reindex(range(len(uniques)), fill_value=self.default).to_numpy(dtype=object)
+        # factorize marks missing names with -1; the fillna above means there are none
+        return pd.Series(categories[codes], index=names.index, name="Category")
+
+
+_matcher = None
+
+
+def default_matcher():
+    """Matcher for the rule table at RULES_PATH, compiled on first use"""
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher(load_rules())
+    return _matcher
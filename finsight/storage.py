@@ -0,0 +1,287 @@
+"""Durable transaction store backed by SQLite"""
+import itertools
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+
+from finsight import tracing
+from finsight.categorize import CATEGORIES, WANT_NEED
+
+COLUMNS = ["Name", "Price", "Date", "Category", "Want or Need"]
+
+# Receipt columns and the table columns they are stored in
+_FIELDS = {
+    "Name": "name",
+    "Price": "price",
+    "Date": "date",
+    "Category": "category",
+    "Want or Need": "want_need",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    batch_id TEXT NOT NULL REFERENCES batches (id),
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    want_need TEXT NOT NULL,
+    fingerprint INTEGER
+);
+CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date, category);
+CREATE INDEX IF NOT EXISTS transactions_category ON transactions (category, date);
+CREATE INDEX IF NOT EXISTS transactions_batch ON transactions (batch_id);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    want_need TEXT NOT NULL,
+    total REAL NOT NULL,
+    items INTEGER NOT NULL,
+    PRIMARY KEY (date, category, want_need)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS transactions_rollup_delete AFTER DELETE ON transactions BEGIN
+    UPDATE daily_totals SET total = total - OLD.price, items = items - 1
+    WHERE date = OLD.date AND category = OLD.category AND want_need = OLD.want_need;
+END;
+CREATE TRIGGER IF NOT EXISTS transactions_rollup_update
+AFTER UPDATE OF price, date, category, want_need ON transactions BEGIN
+    UPDATE daily_totals SET total = total - OLD.price, items = items - 1
+    WHERE date = OLD.date AND category = OLD.category AND want_need = OLD.want_need;
+    INSERT INTO daily_totals (date, category, want_need, total, items)
+    VALUES (NEW.date, NEW.category, NEW.want_need, NEW.price, 1)
+    ON CONFLICT (date, category, want_need) DO UPDATE SET total = total + excluded.total, items = items + 1;
+END;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+# Bulk imports drop this trigger for the duration and roll up the new rows in one statement
+_ROLLUP_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS transactions_rollup_insert AFTER INSERT ON transactions BEGIN
+    INSERT INTO daily_totals (date, category, want_need, total, items)
+    VALUES (NEW.date, NEW.category, NEW.want_need, NEW.price, 1)
+    ON CONFLICT (date, category, want_need) DO UPDATE SET total = total + excluded.total, items = items + 1;
+END
+"""
+
+# Imported rows carry a fingerprint; receipt rows leave it NULL and are never deduplicated
+_FINGERPRINT_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_fingerprint
+ON transactions (fingerprint) WHERE fingerprint IS NOT NULL
+"""
+
+_INSERT = (
+    "INSERT INTO transactions (batch_id, name, price, date, category, want_need)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def _clean(field, value):
+    """Coerce an editor or OCR value to the type stored for a receipt column"""
+    if field == "Name":
+        return "" if value is None or pd.isna(value) else str(value)
+    if field == "Price":
+        try:
+            price = float(value)
+        except (TypeError, ValueError):
+            return 0.0
+        return 0.0 if pd.isna(price) else price
+    if field == "Date":
+        try:
+            timestamp = pd.Timestamp(value)
+        except (TypeError, ValueError):
+            timestamp = pd.NaT
+        return date.today().isoformat() if pd.isna(timestamp) else timestamp.date().isoformat()
+    if field == "Category":
+        return value if value in CATEGORIES else "Other"
+    return value if value in WANT_NEED else "Need"
+
+
+def _rows(batch_id, items):
+    return [(batch_id,) + tuple(_clean(field, item.get(field)) for field in COLUMNS) for item in items]
+
+
+class TransactionStore:
+    """Receipt line items grouped into batches, one batch per receipt.
+
+    Reads return typed DataFrames indexed by transaction id, newest first: Date as
+    datetime64, Price as float, Category and Want or Need as categoricals.
+    ``version`` increases with every write so callers can key caches on it.
+    Safe to share between Streamlit sessions.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(_ROLLUP_INSERT_TRIGGER)
+            # Databases created before bulk import existed lack the fingerprint column
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")}
+            if "fingerprint" not in columns:
+                self._conn.execute("ALTER TABLE transactions ADD COLUMN fingerprint INTEGER")
+            self._conn.execute(_FINGERPRINT_INDEX)
+            # Databases created before the rollup triggers existed need one backfill
+            if not self._conn.execute("SELECT 1 FROM daily_totals LIMIT 1").fetchone():
+                self._conn.execute("""
+                    INSERT INTO daily_totals (date, category, want_need, total, items)
+                    SELECT date, category, want_need, SUM(price), COUNT(*)
+                    FROM transactions GROUP BY date, category, want_need
+                """)
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _bump(self):
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def has_batch(self, batch_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM batches WHERE id = ?", (batch_id,)).fetchone() is not None
+
+    def batch_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM batches").fetchone()[0]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def append_batch(self, batch_id, items, source="receipt"):
+        """Store a receipt's items; a batch that already exists is left untouched"""
+        rows = _rows(batch_id, items)
+        with self._lock, self._conn:
+            created = self._conn.execute(
+                "INSERT OR IGNORE INTO batches (id, source, created_at) VALUES (?, ?, ?)",
+                (batch_id, source, time.time()),
+            ).rowcount
+            if not created:
+                return False
+            self._conn.executemany(_INSERT, rows)
+            self._bump()
+        return True
+
+    def add_rows(self, batch_id, items):
+        """Add items to a batch, creating it if needed"""
+        if not items:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO batches (id, source, created_at) VALUES (?, 'manual', ?)",
+                (batch_id, time.time()),
+            )
+            self._conn.executemany(_INSERT, _rows(batch_id, items))
+            self._bump()
+
+    def import_rows(self, batch_id, frame, source="import"):
+        """Insert an already cleaned frame of COLUMNS plus Fingerprint, skipping known fingerprints.
+
+        Dates must be ISO strings and labels valid; returns how many rows were new.
+        """
+        rows = zip(itertools.repeat(batch_id), *(frame[column].tolist() for column in COLUMNS + ["Fingerprint"]))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO batches (id, source, created_at) VALUES (?, ?, ?)",
+                (batch_id, source, time.time()),
+            )
+            last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+            # A per-row rollup trigger costs more than the insert itself; DDL is transactional,
+            # so the trigger is back in place before anyone else can write
+            self._conn.execute("DROP TRIGGER transactions_rollup_insert")
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO transactions"
+                " (batch_id, name, price, date, category, want_need, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            self._conn.execute("""
+                INSERT INTO daily_totals (date, category, want_need, total, items)
+                SELECT date, category, want_need, SUM(price), COUNT(*)
+                FROM transactions WHERE id > ? GROUP BY date, category, want_need
+                ON CONFLICT (date, category, want_need) DO UPDATE SET
+                    total = total + excluded.total, items = items + excluded.items
+            """, (last_id,))
+            self._conn.execute(_ROLLUP_INSERT_TRIGGER)
+            if inserted:
+                self._bump()
+        return inserted
+
+    def update_rows(self, changes):
+        """Apply {transaction id: {column: value}} edits"""
+        statements = []
+        for row_id, fields in changes.items():
+            for field, value in fields.items():
+                if field in _FIELDS:
+                    statements.append((f"UPDATE transactions SET {_FIELDS[field]} = ? WHERE id = ?",
+                                       (_clean(field, value), int(row_id))))
+        if not statements:
+            return
+        with self._lock, self._conn:
+            for sql, params in statements:
+                self._conn.execute(sql, params)
+            self._bump()
+
+    def delete_rows(self, ids):
+        if not ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM transactions WHERE id = ?", [(int(row_id),) for row_id in ids])
+            self._bump()
+
+    def daily_totals(self):
+        """Per-day spending as (date, category, want_need, total) rows, kept up to date by triggers"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT date, category, want_need, total FROM daily_totals WHERE items > 0"
+            ).fetchall()
+
+    def query(self, start=None, end=None, categories=None, want_need=None, batch_id=None):
+        """Transactions matching the given filters as a typed DataFrame"""
+        where, params = self._where(start, end, categories, want_need, batch_id)
+        sql = (
+            'SELECT id, name AS "Name", price AS "Price", date AS "Date",'
+            ' category AS "Category", want_need AS "Want or Need"'
+            f" FROM transactions {where} ORDER BY date DESC, id DESC"
+        )
+        with tracing.span("store.query") as span:
+            with self._lock:
+                df = pd.read_sql_query(sql, self._conn, params=params, index_col="id")
+            df["Price"] = df["Price"].astype(float)
+            df["Date"] = pd.to_datetime(df["Date"])
+            df["Category"] = pd.Categorical(df["Category"], categories=CATEGORIES)
+            df["Want or Need"] = pd.Categorical(df["Want or Need"], categories=WANT_NEED)
+            span.set(rows=len(df))
+        return df
+
+    @staticmethod
+    def _where(start=None, end=None, categories=None, want_need=None, batch_id=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("date < ?")
+            params.append(end.isoformat())
+        if categories is not None:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if want_need is not None:
+            clauses.append(f"want_need IN ({', '.join('?' * len(want_need))})")
+            params.extend(want_need)
+        if batch_id is not None:
+            clauses.append("batch_id = ?")
+            params.append(batch_id)
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
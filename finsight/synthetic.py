@@ -0,0 +1,144 @@
+"""Synthetic receipt data for benchmarks and offline runs.
+
+Item names are built from a product vocabulary with the brand, size,
+truncation and SKU noise real receipts carry. Prices follow a per-category
+log-normal spread and dates cover several years with busier weekends, so
+1k to 1M rows look like real spending histories.
+"""
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from finsight.categorize import CATEGORIES
+
+# Base product words per (category, want or need)
+PRODUCTS = {
+    ("Groceries", "Need"): [
+        "whole milk", "large eggs", "white bread", "bananas", "chicken breast", "ground beef", "romaine",
+        "cheddar cheese", "greek yogurt", "brown rice", "spaghetti", "tomato sauce", "onions", "potatoes",
+        "apples", "carrots", "butter", "orange juice", "oatmeal", "black beans",
+    ],
+    ("Snacks", "Want"): [
+        "potato chips", "tortilla chips", "choc bar", "gummy bears", "cola", "energy drink", "cookies",
+        "pretzels", "ice cream", "cold brew", "popcorn", "trail mix", "candy", "sparkling water", "donut",
+    ],
+    ("Household", "Need"): [
+        "paper towels", "toilet paper", "dish soap", "laundry detergent", "trash bags", "bleach",
+        "sponges", "hand soap", "shampoo", "toothpaste", "aluminum foil", "light bulbs", "batteries",
+    ],
+    ("Subscriptions", "Want"): [
+        "netflix monthly", "spotify premium", "prime membership", "hulu", "disney plus", "icloud storage",
+        "youtube premium", "gym membership", "news digital", "xbox game pass",
+    ],
+    ("Other", "Want"): [
+        "gift card", "greeting card", "phone case", "usb cable", "magazine", "flowers", "toy car",
+        "lottery", "parking", "tote bag",
+    ],
+}
+BRANDS = ["gv", "kroger", "great value", "kirkland", "store brand", "organic", "365", "fresh", ""]
+SIZES = ["12oz", "1gal", "6ct", "2lb", "16 oz", "24pk", "family size", "lg", ""]
+
+# Share of line items per category, and (median price, spread) of their log-normal prices
+CATEGORY_MIX = {"Groceries": 0.45, "Snacks": 0.2, "Household": 0.15, "Subscriptions": 0.03, "Other": 0.17}
+PRICES = {
+    "Groceries": (4.0, 0.6),
+    "Snacks": (3.0, 0.5),
+    "Household": (7.0, 0.6),
+    "Subscriptions": (13.0, 0.4),
+    "Other": (12.0, 0.9),
+}
+
+
+def item_name(rng, category, want_need, products=PRODUCTS):
+    """One noisy receipt line for a product from ``products[category, want_need]``"""
+    words = rng.choice(products[category, want_need]).split()
+    if rng.random() < 0.3:
+        # Receipt printers truncate words, e.g. "choc" or "detrgnt"
+        index = rng.randrange(len(words))
+        words[index] = words[index][:max(3, len(words[index]) - rng.randrange(4))]
+    name = " ".join(filter(None, [rng.choice(BRANDS), *words, rng.choice(SIZES)]))
+    if rng.random() < 0.3:
+        name += f" {rng.randrange(10 ** 6, 10 ** 7)}"
+    return name.upper()
+
+
+def labelled_items(count, seed=0, products=PRODUCTS):
+    """(name, category, want_need) rows, e.g. to train or evaluate a categorizer.
+
+    ``products`` narrows the vocabulary, e.g. to score a categorizer on
+    products it was not trained on.
+    """
+    rng = random.Random(seed)
+    labels = list(products)
+    rows = []
+    for _ in range(count):
+        category, want_need = rng.choice(labels)
+        rows.append((item_name(rng, category, want_need, products), category, want_need))
+    return rows
+
+
+def transactions(rows, years=3, mix=None, distinct_names=5000, seed=0, today=None):
+    """A DataFrame of ``rows`` transactions with the store's columns, newest dates up to ``today``.
+
+    Names are drawn from a pool of ``distinct_names`` per-category names,
+    as a shopper buys the same things again and again.
+    """
+    mix = mix or CATEGORY_MIX
+    rng = np.random.default_rng(seed)
+    categories = list(mix)
+    weights = np.array([mix[category] for category in categories], dtype=float)
+    picked = rng.choice(len(categories), size=rows, p=weights / weights.sum())
+
+    names = np.empty(rows, dtype=object)
+    want_need = np.empty(rows, dtype=object)
+    prices = np.empty(rows)
+    name_rng = random.Random(seed)
+    for index, category in enumerate(categories):
+        where = np.flatnonzero(picked == index)
+        if not len(where):
+            continue
+        pool_labels = [label for label in PRODUCTS if label[0] == category] or [(category, "Need")]
+        pool = [item_name(name_rng, *name_rng.choice(pool_labels))
+                for _ in range(max(1, distinct_names * len(where) // rows))]
+        names[where] = np.array(pool, dtype=object)[rng.integers(len(pool), size=len(where))]
+        want_need[where] = pool_labels[0][1]
+        median, spread = PRICES.get(category, (10.0, 0.8))
+        prices[where] = np.round(rng.lognormal(np.log(median), spread, size=len(where)), 2)
+
+    # Weekends get about 40% more shopping than weekdays
+    today = today or date.today()
+    days = years * 365
+    offsets = rng.integers(days, size=rows * 2)
+    weekday = (today - timedelta(days=1)).weekday()
+    weekend = ((weekday - offsets) % 7) >= 5
+    keep = rng.random(len(offsets)) < np.where(weekend, 1.0, 1 / 1.4)
+    offsets = np.resize(offsets[keep], rows)
+    dates = pd.Timestamp(today) - pd.to_timedelta(offsets + 1, unit="D")
+
+    return pd.DataFrame({
+        "Name": names,
+        "Price": np.maximum(prices, 0.01),
+        "Date": dates,
+        "Category": pd.Categorical([categories[i] for i in picked], categories=CATEGORIES),
+        "Want or Need": want_need,
+    })
+
+
+def seed_store(store, rows, batch_id="synthetic", **kwargs):
+    """Fill a TransactionStore with ``rows`` synthetic transactions in one bulk write.
+
+    Can be called again on the same store to add more rows; raises
+    RuntimeError if any row was skipped as already stored.
+    """
+    frame = transactions(rows, **kwargs)
+    frame["Date"] = frame["Date"].dt.strftime("%Y-%m-%d")
+    frame["Category"] = frame["Category"].astype(str)
+    # Numbered on from the rows already stored, so a second call never reuses the first one's
+    frame["Fingerprint"] = np.arange(rows) + store.count() - 2 ** 62
+    inserted = store.import_rows(batch_id, frame, source="synthetic")
+    if inserted != rows:
+        raise RuntimeError(f"Only {inserted:,} of {rows:,} synthetic rows were stored;"
+                           " the rest clashed with stored fingerprints")
+    return frame
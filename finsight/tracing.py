@@ -0,0 +1,223 @@
+"""Lightweight spans and counters for the hot paths.
+
+Tracing is off unless FINSIGHT_TRACE is set or ``enable()`` is called;
+while off, ``span()`` hands back a shared no-op object, so instrumented
+code pays one function call and a flag check. While on, every span and
+counter feeds process-wide aggregates (exported every few seconds when
+FINSIGHT_TRACE_EXPORT names a file: Prometheus text for ``.prom``,
+otherwise one JSON line per export). A Streamlit rerun can also capture
+its own spans for the sidebar performance panel, which traces that run's
+context only: other sessions keep paying nothing.
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+
+EXPORT_PATH = os.getenv("FINSIGHT_TRACE_EXPORT")
+EXPORT_INTERVAL = 10.0
+
+_enabled = bool(os.getenv("FINSIGHT_TRACE") or EXPORT_PATH)
+_lock = threading.Lock()
+# span name -> [count, total seconds, max seconds]; counter name -> value
+_spans = {}
+_counters = {}
+_exporter = None
+
+# Spans recorded during the current rerun, and how deeply the current span is nested
+_rerun = contextvars.ContextVar("finsight_rerun", default=None)
+_depth = contextvars.ContextVar("finsight_depth", default=0)
+
+
+class SpanRecord:
+    """One finished span: name, start time, seconds, nesting depth and attributes such as token counts"""
+    __slots__ = ("name", "started", "seconds", "depth", "attrs")
+
+    def __init__(self, name, started, seconds, depth, attrs):
+        self.name = name
+        self.started = started
+        self.seconds = seconds
+        self.depth = depth
+        self.attrs = attrs
+
+
+class Rerun:
+    """Spans captured during one script run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "_began", "_token")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes, e.g. token counts known only once the call returns"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _depth.set(_depth.get() + 1)
+        self._began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._began
+        try:
+            _depth.reset(self._token)
+        except ValueError:
+            # A generator holding the span was closed from another context
+            pass
+        with _lock:
+            stats = _spans.setdefault(self.name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        rerun = _rerun.get()
+        if rerun is not None:
+            rerun.spans.append(SpanRecord(self.name, self._began, seconds, _depth.get(), self.attrs))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullSpan()
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    """Turn tracing on for the whole process, as FINSIGHT_TRACE does"""
+    global _enabled
+    _enabled = True
+    _start_exporter()
+
+
+def span(name, **attrs):
+    """Context manager timing a block as ``name``; a shared no-op unless tracing is on or the rerun is captured"""
+    if not _enabled and _rerun.get() is None:
+        return _NULL
+    return _Span(name, attrs)
+
+
+def count(name, value=1):
+    """Add ``value`` to the counter ``name``, e.g. tokens sent or cache hits"""
+    if not _enabled and _rerun.get() is None:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def token_usage(response, prompt, text):
+    """(prompt, response) token counts from Gemini usage metadata, else estimated at ~4 characters a token"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None and getattr(usage, "prompt_token_count", None):
+        return usage.prompt_token_count, usage.candidates_token_count
+    return len(prompt) // 4, len(text) // 4
+
+
+def start_rerun():
+    """Begin capturing the spans of the current script run, even while tracing is off; returns the Rerun.
+
+    Replaces any capture left in this context by a run that stopped early
+    (``st.rerun``, ``st.stop`` or an exception) before calling ``end_rerun``.
+    """
+    rerun = Rerun()
+    _rerun.set(rerun)
+    return rerun
+
+
+def end_rerun():
+    """Stop capturing and return the current run's Rerun, or None if it was not being captured"""
+    rerun = _rerun.get()
+    _rerun.set(None)
+    return rerun
+
+
+def snapshot():
+    """Aggregates so far: {"spans": {name: {count, seconds, max_seconds}}, "counters": {...}}"""
+    with _lock:
+        return {
+            "spans": {name: {"count": stats[0], "seconds": stats[1], "max_seconds": stats[2]}
+                      for name, stats in _spans.items()},
+            "counters": dict(_counters),
+        }
+
+
+def _metric_name(name):
+    return "".join(char if char.isalnum() else "_" for char in name)
+
+
+def prometheus_text(data=None):
+    """Aggregates in the Prometheus text exposition format"""
+    data = data or snapshot()
+    lines = ["# TYPE finsight_span_seconds summary"]
+    for name, stats in sorted(data["spans"].items()):
+        lines.append(f'finsight_span_seconds_sum{{span="{name}"}} {stats["seconds"]:.6f}')
+        lines.append(f'finsight_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    for name, value in sorted(data["counters"].items()):
+        metric = f"finsight_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def export(path=EXPORT_PATH):
+    """Write the aggregates to ``path``: replace a .prom file, or append one JSON line"""
+    if not path:
+        return
+    data = snapshot()
+    if path.endswith(".prom"):
+        # Write then rename so a scraper never reads half a file
+        partial = f"{path}.partial"
+        with open(partial, "w") as f:
+            f.write(prometheus_text(data))
+        os.replace(partial, path)
+    else:
+        with open(path, "a") as f:
+            f.write(json.dumps({"time": time.time(), **data}) + "\n")
+
+
+def _start_exporter():
+    global _exporter
+    if not EXPORT_PATH or _exporter is not None:
+        return
+    with _lock:
+        if _exporter is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(EXPORT_INTERVAL)
+                export()
+
+        _exporter = threading.Thread(target=run, name="trace-export", daemon=True)
+        _exporter.start()
+    atexit.register(export)
+
+
+if _enabled:
+    _start_exporter()
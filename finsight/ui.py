@@ -0,0 +1,122 @@
+"""Streamlit building blocks shared by the FinSight pages"""
+import streamlit as st
+
+from finsight import tracing
+from finsight.categorize import CATEGORIES, WANT_NEED
+from finsight.classifier import USER_WEIGHT
+from finsight.resources import get_category_cache, get_classifier, get_store
+
+# Column setup shared by every transaction editor
+TRANSACTION_COLUMNS = {
+    "Name": st.column_config.TextColumn("Name"),
+    "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
+    "Date": st.column_config.DateColumn("Date"),
+    "Category": st.column_config.SelectboxColumn(
+        "Category",
+        options=CATEGORIES
+    ),
+    "Want or Need": st.column_config.SelectboxColumn(
+        "Want or Need",
+        options=WANT_NEED
+    )
+}
+
+
+def find_corrections(df, edited_rows):
+    """(Name, Category, Want or Need) for rows whose labels were changed in a data editor"""
+    corrections = []
+    for row, changes in edited_rows.items():
+        if row >= len(df) or not ("Category" in changes or "Want or Need" in changes):
+            continue
+        item = {**df.iloc[row].to_dict(), **changes}
+        if item["Category"] in CATEGORIES and item["Want or Need"] in WANT_NEED:
+            corrections.append((item["Name"], item["Category"], item["Want or Need"]))
+    return corrections
+
+
+def save_editor_changes(widget_key, df, ids, batch_id):
+    """Write a transaction editor's edits, additions and deletions to the store"""
+    delta = st.session_state[widget_key]
+    store = get_store()
+    store.update_rows({ids[row]: changes for row, changes in delta["edited_rows"].items()})
+    store.add_rows(batch_id, delta["added_rows"])
+    store.delete_rows([ids[row] for row in delta["deleted_rows"]])
+    corrections = find_corrections(df, delta["edited_rows"])
+    get_category_cache().put_many(corrections, source="user")
+    get_classifier().learn(corrections, weight=USER_WEIGHT)
+
+
+def transaction_editor(df, key, batch_id="manual", page_size=50):
+    """Editable, paginated table of stored transactions; rows added here go into ``batch_id``
+
+    Only the current page is sent to the browser, and only the rows the
+    user changed are written back.
+    """
+    pages = max((len(df) - 1) // page_size + 1, 1)
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = 1
+    if pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * page_size
+    window = df.iloc[start:start + page_size]
+
+    # The editor works on row positions; keep the transaction ids alongside to map edits back
+    ids = window.index.tolist()
+    window = window.reset_index(drop=True)
+
+    # Every saved change bumps the store version, giving the editor a fresh key so
+    # its row positions always line up with the freshly loaded page
+    widget_key = f"{key}_{page}_{get_store().version}"
+    edited = st.data_editor(
+        window,
+        column_config=TRANSACTION_COLUMNS,
+        num_rows="dynamic",
+        hide_index=True,
+        key=widget_key,
+        on_change=save_editor_changes,
+        args=(widget_key, window, ids, batch_id)
+    )
+    if pages > 1:
+        st.caption(f"Showing {start + 1}-{start + len(window)} of {len(df)} transactions")
+    return edited
+
+
+def performance_toggle():
+    """Sidebar switch for the performance panel; while it is on, this rerun's spans are captured"""
+    # Widget state is dropped on page switches, so the choice is kept in its own session key
+    st.session_state.show_performance = st.sidebar.toggle(
+        "⏱️ Performance panel", value=st.session_state.get("show_performance", False)
+    )
+    # Only this session's reruns are traced; other sessions keep the no-op spans
+    if st.session_state.show_performance:
+        tracing.start_rerun()
+    else:
+        # Drop a capture left by an earlier run that stopped before drawing its panel
+        tracing.end_rerun()
+
+
+def performance_panel():
+    """Sidebar breakdown of where the current rerun spent its time; call at the end of a page"""
+    rerun = tracing.end_rerun()
+    if rerun is None:
+        return
+    total = rerun.seconds
+    traced = sum(span.seconds for span in rerun.spans if span.depth == 0)
+    rows = [
+        {
+            "Span": "\u2003" * span.depth + span.name,
+            "ms": round(span.seconds * 1000, 1),
+            "Details": ", ".join(f"{key}={value}" for key, value in span.attrs.items()),
+        }
+        for span in sorted(rerun.spans, key=lambda span: span.started)
+    ]
+    with st.sidebar.expander("This rerun", expanded=True):
+        st.caption(f"{total * 1000:.0f} ms in total; {(total - traced) * 1000:.0f} ms outside traced spans"
+                   " (Streamlit rendering, widgets and cached calls)")
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        counters = tracing.snapshot()["counters"]
+        if counters:
+            st.caption(" · ".join(f"{name}: {value:,.0f}" for name, value in sorted(counters.items())))
@@ -1,119 +1,193 @@
+import hashlib
+from datetime import date
+
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import os
-from app import process_receipt, categorize_items
+from finsight.importer import (
+    COLUMN_GUESSES, DATE_FORMATS, SAMPLE_ROWS, check_mapping, file_kind, guess_columns, guess_date_format,
+    import_transactions, sample_columns, spending_is_negative
+)
+from finsight.jobs import ACTIVE, DONE, FAILED
+from finsight.pipeline import image_key
+from finsight.resources import get_category_cache, get_classifier, get_job_queue, get_store, get_transactions
+from finsight.ui import performance_panel, performance_toggle, transaction_editor
+
+st.set_page_config(
+    page_title="FinSight",
+    page_icon="💰",
+    layout="wide"
+)
 
 st.sidebar.title("FinSight")
 st.sidebar.page_link("app.py", label="Dashboard", icon="📊")
 st.sidebar.page_link("pages/upload_receipt.py", label="Upload Receipt", icon="📄")
 st.sidebar.page_link("pages/ai_insights.py", label="AI Insights", icon="💡")
+performance_toggle()
 
 st.title("📄 Upload Receipt")
 
-def process_image(image_path):
-    """Process the uploaded or captured image"""
-    try:
-        # Process the receipt
-        items = process_receipt(image_path)
-        if items:
-            # Categorize items
-            categorized_items = categorize_items(items)
-            
-            # Create a unique key for this batch of items
-            batch_key = f"receipt_batch_{datetime.now().timestamp()}"
-            
-            # Store the batch in session state
-            if 'receipt_batches' not in st.session_state:
-                st.session_state.receipt_batches = {}
-            
-            st.session_state.receipt_batches[batch_key] = categorized_items
-            
-            # Display results
-            st.success("Receipt processed successfully!")
-            
-            # Display data editor for the newly added items
-            edited_df = st.data_editor(
-                pd.DataFrame(categorized_items),
-                column_config={
-                    "Name": st.column_config.TextColumn("Name"),
-                    "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
-                    "Date": st.column_config.DateColumn("Date"),
-                    "Category": st.column_config.SelectboxColumn(
-                        "Category",
-                        options=["Groceries", "Snacks", "Household", "Subscriptions", "Other"]
-                    ),
-                    "Want or Need": st.column_config.SelectboxColumn(
-                        "Want or Need",
-                        options=["Want", "Need"]
-                    )
-                },
-                num_rows="dynamic",
-                key=batch_key
+store = get_store()
+
+# Receipts uploaded in this session, by batch id
+if 'receipt_batches' not in st.session_state:
+    st.session_state.receipt_batches = {}
+
+# Background jobs submitted from this session, by job id; the same id as the receipt's batch
+if 'upload_jobs' not in st.session_state:
+    st.session_state.upload_jobs = {}
+
+STATUS_LABELS = {
+    "queued": "⏳ Waiting",
+    "ocr": "🔍 Reading receipt",
+    "categorizing": "🏷️ Categorizing items",
+}
+
+def describe_job(job):
+    """One-line summary of a receipt job"""
+    if job.status == FAILED:
+        return f"❌ **{job.filename}**: {job.error}"
+    if job.status != DONE:
+        retry = f" (retrying after: {job.error})" if job.error else ""
+        return f"{STATUS_LABELS[job.status]}: {job.filename}{retry}"
+    summary = job.summary
+    if summary.get("cached"):
+        return f"✅ **{job.filename}**: {summary['items']} items (already processed)"
+    line = f"✅ **{job.filename}**: {summary['items']} items in {summary['seconds']:.1f}s"
+    if "bytes_in" in summary:
+        line += f" · image {summary['bytes_in'] / 1024:.0f} KB → {summary['bytes_out'] / 1024:.0f} KB"
+    if "ai_calls" in summary:
+        line += (f" · {summary['ai_calls']} AI call(s) in {summary['ai_seconds']:.2f}s,"
+                 f" {summary['from_cache']} from cache, {summary.get('by_classifier', 0)} by local model,"
+                 f" {summary['by_keyword']} by keyword")
+    return line
+
+def submit_images(uploads):
+    """Queue uploaded or captured images for background processing"""
+    for image_bytes, filename in uploads:
+        # Uploads stay in the widget across reruns; each image is submitted once per session,
+        # and the queue keeps one job per image, so a failed receipt is only retried on request
+        if image_key(image_bytes) in st.session_state.upload_jobs:
+            continue
+        job_id = get_job_queue().submit(image_bytes, filename)
+        st.session_state.upload_jobs[job_id] = filename
+
+def show_jobs(polling=False):
+    """Progress of this session's jobs; finished receipts get an editor on the next full rerun.
+
+    ``polling`` is set when this runs as a fragment refreshing itself, which
+    hands back to a full rerun once nothing is left in flight.
+    """
+    jobs = get_job_queue().jobs(st.session_state.upload_jobs)
+    finished = sum(job.status not in ACTIVE for job in jobs.values())
+    if finished < len(jobs):
+        st.progress(finished / len(jobs), text=f"Processed {finished} of {len(jobs)} receipt(s)")
+    newly_done = False
+    for job in (jobs[job_id] for job_id in st.session_state.upload_jobs if job_id in jobs):
+        st.markdown(describe_job(job))
+        if job.status == FAILED and st.button("Retry", key=f"retry_{job.id[:16]}"):
+            get_job_queue().retry(job.id)
+            st.rerun()
+        if job.status == DONE and job.id not in st.session_state.receipt_batches:
+            st.session_state.receipt_batches[job.id] = job.filename
+            newly_done = True
+    # A full rerun shows new editors and, with nothing in flight, stops the polling
+    if newly_done or (polling and finished == len(jobs)):
+        st.rerun()
+
+# Shown next to each date format, with a day above 12 so day-first and month-first differ
+EXAMPLE_DATE = date(2024, 1, 31)
+
+def import_export(export):
+    """Column mapping, date format and import button for a bank CSV or OFX/QFX export"""
+    mapping, negative_spending, date_format, problem = None, True, None, None
+    if file_kind(export.name) == "csv":
+        sample = sample_columns(export, rows=SAMPLE_ROWS)
+        st.dataframe(sample.head(), hide_index=True)
+        guess = guess_columns(sample.columns)
+        options = [None] + list(sample.columns)
+        mapping = {}
+        for column, field in zip(st.columns(len(COLUMN_GUESSES)), COLUMN_GUESSES):
+            with column:
+                mapping[field] = st.selectbox(
+                    field, options, index=options.index(guess[field]),
+                    format_func=lambda option: "(none)" if option is None else option, key=f"import_{field}"
+                )
+        detected = spending_is_negative(sample[mapping["Price"]]) if mapping["Price"] is not None else True
+        negative_spending = st.checkbox("Spending amounts are negative", value=detected)
+        # Guessed once from the sample and used for every chunk, so the whole file is read the same way
+        detected = guess_date_format(sample[mapping["Date"]]) if mapping["Date"] is not None else None
+        date_format = st.selectbox(
+            "Date format", DATE_FORMATS, index=DATE_FORMATS.index(detected) if detected else 0,
+            format_func=lambda option: f"{option} (e.g. {EXAMPLE_DATE.strftime(option)})",
+            key=f"import_date_format_{mapping['Date']}",
+        )
+        if mapping["Date"] is not None and detected is None:
+            st.warning("No date format reads every date in the first rows; rows it cannot read will be skipped.")
+        try:
+            check_mapping(mapping)
+        except ValueError as e:
+            problem = str(e)
+            st.error(problem)
+
+    if st.button("Import transactions", disabled=problem is not None):
+        progress = st.progress(0.0, text="Importing...")
+        size = max(export.size, 1)
+        try:
+            report = import_transactions(
+                get_store(), export, export.name,
+                batch_id="import:" + hashlib.sha256(export.getvalue()).hexdigest()[:16],
+                mapping=mapping, negative_spending=negative_spending, classifier=get_classifier(),
+                date_format=date_format,
+                progress=lambda report: progress.progress(
+                    min(export.tell() / size, 1.0), text=f"Read {report.rows:,} rows..."
+                ),
             )
-            
-            # Update the batch in session state with edited data
-            st.session_state.receipt_batches[batch_key] = edited_df.to_dict('records')
-            
-            # Update the main receipts data
-            st.session_state.receipts_data = []
-            for batch in st.session_state.receipt_batches.values():
-                st.session_state.receipts_data.extend(batch)
-            
-            # Clean up temporary file
-            os.remove(image_path)
-        else:
-            st.error("No items found in the receipt. Please try again with a clearer image.")
-    except Exception as e:
-        st.error(f"Error processing image: {str(e)}")
-        # Clean up temporary file even if there's an error
-        if os.path.exists(image_path):
-            os.remove(image_path)
+        except Exception as e:
+            st.error(f"Error importing {export.name}: {str(e)}")
+            return
+        progress.empty()
+        st.success(
+            f"Imported {report.imported:,} transactions from {report.rows:,} rows in {report.seconds:.1f}s"
+            f" ({report.duplicates:,} already stored, {report.skipped:,} payments or refunds skipped)"
+        )
+        if report.unreadable:
+            st.warning(f"{report.unreadable:,} rows were dropped because their date or amount could not be read"
+                       + (f" as {date_format}" if date_format else "") + ".")
 
 # Create tabs for different upload methods
-upload_method = st.radio("Choose upload method:", ["File Upload", "Camera"])
+upload_method = st.radio("Choose upload method:", ["File Upload", "Camera", "Bank Export"])
 
 if upload_method == "File Upload":
-    uploaded_file = st.file_uploader("Upload a receipt image", type=["jpg", "jpeg", "png"])
-    if uploaded_file is not None:
-        # Save the uploaded file temporarily
-        with open("temp_receipt.jpg", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        process_image("temp_receipt.jpg")
+    uploaded_files = st.file_uploader("Upload receipt images", type=["jpg", "jpeg", "png"], accept_multiple_files=True)
+    if uploaded_files:
+        submit_images([(uploaded_file.getvalue(), uploaded_file.name) for uploaded_file in uploaded_files])
+elif upload_method == "Bank Export":
+    # Years of card history at once, read in chunks and categorized locally
+    export = st.file_uploader("Upload a CSV, OFX or QFX export from your bank", type=["csv", "ofx", "qfx"])
+    if export is not None:
+        import_export(export)
 else:
     # Camera input
     img_file_buffer = st.camera_input("Take a picture of your receipt")
     if img_file_buffer is not None:
-        # Save the captured image temporarily
-        with open("temp_receipt.jpg", "wb") as f:
-            f.write(img_file_buffer.getbuffer())
-        process_image("temp_receipt.jpg")
+        submit_images([(img_file_buffer.getvalue(), img_file_buffer.name)])
+
+if st.session_state.upload_jobs:
+    # Poll while anything is still in flight instead of blocking the page on it
+    active = any(job.status in ACTIVE for job in get_job_queue().jobs(st.session_state.upload_jobs).values())
+    st.fragment(show_jobs, run_every=1.0 if active else None)(polling=active)
+    cache = get_category_cache()
+    st.caption(f"Category cache: {cache.hits} hits / {cache.misses} misses")
+
+# Display an editor for each receipt processed in this session
+if st.session_state.receipt_batches:
+    st.success(f"{len(st.session_state.receipt_batches)} receipt(s) processed successfully!")
+    for batch_id, filename in st.session_state.receipt_batches.items():
+        with st.expander(filename, expanded=len(st.session_state.receipt_batches) == 1):
+            transaction_editor(store.query(batch_id=batch_id), key=f"receipt_batch_{batch_id[:16]}", batch_id=batch_id)
 
 # Display all receipts in a single editor if there are any
-if st.session_state.receipts_data:
-    # Count unique receipts (assuming each receipt has at least one item)
-    receipt_count = len(st.session_state.receipt_batches) if 'receipt_batches' in st.session_state else 1
-    
-    if receipt_count > 1:
-        st.subheader("All Receipts")
-        all_receipts_df = st.data_editor(
-            pd.DataFrame(st.session_state.receipts_data),
-            column_config={
-                "Name": st.column_config.TextColumn("Name"),
-                "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
-                "Date": st.column_config.DateColumn("Date"),
-                "Category": st.column_config.SelectboxColumn(
-                    "Category",
-                    options=["Groceries", "Snacks", "Household", "Subscriptions", "Other"]
-                ),
-                "Want or Need": st.column_config.SelectboxColumn(
-                    "Want or Need",
-                    options=["Want", "Need"]
-                )
-            },
-            num_rows="dynamic",
-            key="all_receipts_editor"
-        )
-        
-        # Update session state with all edited data
-        st.session_state.receipts_data = all_receipts_df.to_dict('records') 
\ No newline at end of file
+if store.batch_count() > 1:
+    st.subheader("All Receipts")
+    transaction_editor(get_transactions(), key="all_receipts_editor")
+
+performance_panel()
@@ -0,0 +1,8 @@
+import pytest
+
+from finsight.storage import TransactionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TransactionStore(str(tmp_path / "finsight.db"))
@@ -0,0 +1,103 @@
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from finsight.analytics import SpendingIndex, get_spending_stats
+from finsight.categorize import CATEGORIES, WANT_NEED
+
+START = date(2023, 1, 1)
+
+
+def random_items(rng, count):
+    return [
+        {
+            "Name": f"ITEM {rng.randrange(50)}",
+            "Price": round(rng.uniform(0.5, 80), 2),
+            "Date": START + timedelta(days=rng.randrange(730)),
+            "Category": rng.choice(CATEGORIES),
+            "Want or Need": rng.choice(WANT_NEED),
+        }
+        for _ in range(count)
+    ]
+
+
+def brute_force(df, start=None, end=None, categories=None, want_need=None):
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["Date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["Date"] < pd.Timestamp(end)
+    if categories is not None:
+        mask &= df["Category"].isin(categories)
+    if want_need is not None:
+        mask &= df["Want or Need"].isin(want_need)
+    return df.loc[mask, "Price"].sum()
+
+
+def test_totals_match_brute_force_over_random_ranges(store):
+    rng = random.Random(0)
+    store.append_batch("receipts", random_items(rng, 5000))
+    index = SpendingIndex(store).sync()
+    df = store.query()
+    for _ in range(300):
+        # Ranges may start before the first day or end after the last one
+        start = START + timedelta(days=rng.randrange(-30, 760))
+        end = start + timedelta(days=rng.randrange(0, 400))
+        categories = rng.choice([None, rng.sample(CATEGORIES, rng.randrange(1, len(CATEGORIES)))])
+        want_need = rng.choice([None, ["Want"], ["Need"]])
+        expected = brute_force(df, start, end, categories, want_need)
+        assert index.total(start, end, categories, want_need) == pytest.approx(expected, abs=1e-6)
+    assert index.total() == pytest.approx(df["Price"].sum())
+    by_category = df.groupby("Category", observed=False)["Price"].sum()
+    for category, total in index.by_category().items():
+        assert total == pytest.approx(by_category[category], abs=1e-6)
+
+
+def test_index_follows_edits_and_deletes(store):
+    rng = random.Random(1)
+    store.append_batch("receipts", random_items(rng, 500))
+    index = SpendingIndex(store).sync()
+    df = store.query()
+    store.update_rows({row_id: {"Price": 1.0, "Category": "Snacks", "Date": date(2024, 6, 1)} for row_id in df.index[:50]})
+    store.delete_rows(list(df.index[50:100]))
+    store.add_rows("manual", random_items(rng, 20))
+    index.sync()
+    df = store.query()
+    for start, end in [(None, None), (date(2024, 6, 1), date(2024, 6, 2)), (date(2023, 3, 1), date(2024, 3, 1))]:
+        for categories in [None, ["Snacks"], ["Groceries", "Other"]]:
+            assert index.total(start, end, categories) == pytest.approx(brute_force(df, start, end, categories))
+
+
+def test_rollups_match_line_items_after_writes(store):
+    rng = random.Random(2)
+    store.append_batch("receipts", random_items(rng, 300))
+    df = store.query()
+    store.update_rows({df.index[0]: {"Want or Need": "Want"}, df.index[1]: {"Price": 100.0}})
+    store.delete_rows(list(df.index[2:10]))
+    df = store.query()
+    rollups = pd.DataFrame(store.daily_totals(), columns=["Date", "Category", "Want or Need", "Price"])
+    rollups = rollups.set_index(["Date", "Category", "Want or Need"])["Price"].sort_index()
+    df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+    expected = df.astype({"Category": str, "Want or Need": str}).groupby(
+        ["Date", "Category", "Want or Need"])["Price"].sum().sort_index()
+    pd.testing.assert_series_equal(rollups, expected, check_names=False, atol=1e-6)
+
+
+def test_spending_stats_ranges(store):
+    today = date(2024, 5, 15)  # a Wednesday
+    store.append_batch("receipts", [
+        {"Name": "A", "Price": 10.0, "Date": date(2024, 5, 13), "Category": "Groceries", "Want or Need": "Need"},
+        {"Name": "B", "Price": 5.0, "Date": date(2024, 5, 2), "Category": "Snacks", "Want or Need": "Want"},
+        {"Name": "C", "Price": 7.0, "Date": date(2024, 4, 30), "Category": "Other", "Want or Need": "Need"},
+        {"Name": "D", "Price": 3.0, "Date": date(2024, 3, 31), "Category": "Other", "Want or Need": "Need"},
+    ])
+    stats = get_spending_stats(SpendingIndex(store).sync(), today)
+    assert stats == {"Current Month": 15.0, "Last Month": 7.0, "This Week": 10.0}
+
+
+def test_empty_store(store):
+    index = SpendingIndex(store).sync()
+    assert index.total() == 0.0
+    assert get_spending_stats(index, date(2024, 5, 15))["Current Month"] == 0.0
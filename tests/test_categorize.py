@@ -0,0 +1,101 @@
+import json
+import re
+
+import pytest
+
+from finsight.cache import CategoryCache
+from finsight.categorize import (
+    DEFAULT_WANT_NEED, apply_batch_response, build_batch_prompt, categorize_batch, parse_batch_response,
+)
+from finsight.classifier import ItemClassifier
+from finsight.fakes import FakeModel
+
+
+def items(*names):
+    # As OCR hands them over: placeholder labels until categorization fills them in
+    return [{"Name": name, "Price": 2.0, "Category": "Other", "Want or Need": "Need"} for name in names]
+
+
+def prompt_names(prompt):
+    return [row["name"] for row in json.loads(re.search(r"Items:\s*(\[.*\])", prompt, re.DOTALL).group(1))]
+
+
+def answering(answers):
+    """Responder answering each prompted name from ``answers`` {name: (category, want_or_need)}"""
+    def respond(prompt):
+        rows = [{"index": i, "category": answers[name][0], "want_or_need": answers[name][1]}
+                for i, name in enumerate(prompt_names(prompt)) if name in answers]
+        return f"```json\n{json.dumps(rows)}\n```"
+    return respond
+
+
+def test_parse_batch_response():
+    assert parse_batch_response('Sure! [{"index": 0, "category": "Snacks"}] Hope that helps') == [
+        {"index": 0, "category": "Snacks"}
+    ]
+    assert parse_batch_response('[{"index": 0}, "junk", 3]') == [{"index": 0}]
+    assert parse_batch_response("[not json]") == []
+    assert parse_batch_response('{"index": 0}') == []
+    assert parse_batch_response(None) == []
+
+
+def test_apply_batch_response_needs_both_fields():
+    chunk = items("A", "B", "C", "D")
+    pending = apply_batch_response(chunk, [
+        {"index": 0, "category": "Snacks", "want_or_need": "want"},
+        {"index": 1, "category": "Snacks", "want_or_need": "unsure"},
+        {"index": 2, "category": "Candy", "want_or_need": "Want"},
+        {"index": 7, "category": "Snacks", "want_or_need": "Want"},
+        {"index": "3", "category": "Snacks", "want_or_need": "Want"},
+    ])
+    assert pending == {1, 2, 3}
+    assert (chunk[0]["Category"], chunk[0]["Want or Need"]) == ("Snacks", "Want")
+    assert [(item["Category"], item["Want or Need"]) for item in chunk[1:]] == [("Other", "Need")] * 3
+
+
+def test_build_batch_prompt_lists_every_item():
+    assert prompt_names(build_batch_prompt(items("MILK", "CHIPS"))) == ["MILK", "CHIPS"]
+
+
+def test_categorize_batch_with_fake_model(tmp_path):
+    cache = CategoryCache(str(tmp_path / "categories.db"))
+    model = FakeModel(answering({"GUMMY BEARS": ("Snacks", "unsure"), "BLEACH": ("Household", "Need")}))
+    receipt = items("GUMMY BEARS", "BLEACH", "CANDY BAR")
+    stats = categorize_batch(receipt, model, cache=cache)
+
+    assert (stats.calls, stats.fallbacks) == (1, 2)
+    assert [(item["Category"], item["Want or Need"]) for item in receipt] == [
+        ("Other", DEFAULT_WANT_NEED["Other"]), ("Household", "Need"), ("Snacks", DEFAULT_WANT_NEED["Snacks"]),
+    ]
+    # Only the complete answer is remembered, so the others are asked again next time
+    assert cache.get_many(["GUMMY BEARS", "BLEACH", "CANDY BAR"]) == {"bleach": ("Household", "Need")}
+
+
+def test_categorize_batch_chunks_and_uses_the_cache(tmp_path):
+    cache = CategoryCache(str(tmp_path / "categories.db"))
+    answers = {f"ITEM {i}": ("Groceries", "Need") for i in range(7)}
+    model = FakeModel(answering(answers))
+    stats = categorize_batch(items(*answers), model, batch_size=3, cache=cache)
+    assert (stats.calls, stats.fallbacks, stats.cached) == (3, 0, 0)
+
+    again = items(*answers)
+    stats = categorize_batch(again, model, batch_size=3, cache=cache)
+    assert (stats.calls, stats.cached) == (0, 7)
+    assert model.calls == 3
+    assert {(item["Category"], item["Want or Need"]) for item in again} == {("Groceries", "Need")}
+
+
+def test_failed_model_call_falls_back_to_keywords():
+    receipt = items("WHOLE MILK", "NETFLIX")
+    stats = categorize_batch(receipt, FakeModel(error_rate=1.0))
+    assert (stats.calls, stats.fallbacks) == (1, 2)
+    assert [(item["Category"], item["Want or Need"]) for item in receipt] == [
+        ("Groceries", "Need"), ("Subscriptions", "Want"),
+    ]
+
+
+def test_classifier_learns_only_complete_answers():
+    classifier = ItemClassifier()
+    model = FakeModel(answering({"GUMMY BEARS": ("Snacks", "unsure"), "BLEACH": ("Household", "Need")}))
+    categorize_batch(items("GUMMY BEARS", "BLEACH"), model, classifier=classifier)
+    assert classifier.examples == pytest.approx(1.0)
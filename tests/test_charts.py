@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from finsight.analytics import SpendingIndex, get_spending_stats
+from finsight.charts import by_category, daily_frame, over_time, select_daily
+
+
+def rows():
+    # Mon 2026-10-12 through Mon 2026-10-19, one dollar a day, plus one snack on the Sunday
+    days = [date(2026, 10, 12) + timedelta(days=i) for i in range(8)]
+    return [(day.isoformat(), "Groceries", "Need", 1.0) for day in days] + [("2026-10-18", "Snacks", "Want", 2.5)]
+
+
+def test_weeks_run_monday_to_sunday_and_are_labelled_by_their_monday():
+    weeks = over_time(daily_frame(rows()), "Category", "Week")
+    groceries = weeks[weeks["Category"] == "Groceries"].set_index("Date")["Price"]
+    assert groceries.to_dict() == {pd.Timestamp("2026-10-12"): 7.0, pd.Timestamp("2026-10-19"): 1.0}
+    snacks = weeks[weeks["Category"] == "Snacks"]
+    assert snacks["Date"].tolist() == [pd.Timestamp("2026-10-12")]
+
+
+def test_weekly_chart_matches_this_week_metric(store):
+    store.add_rows("manual", [{"Name": "MILK", "Price": price, "Date": day, "Category": category,
+                               "Want or Need": want_need} for day, category, want_need, price in rows()])
+    today = date(2026, 10, 19)
+    stats = get_spending_stats(SpendingIndex(store).sync(), today=today)
+    weeks = over_time(daily_frame(store.daily_totals()), "Category", "Week")
+    this_week = weeks[weeks["Date"] == pd.Timestamp(today - timedelta(days=today.weekday()))]["Price"].sum()
+    assert this_week == stats["This Week"]
+
+
+def test_days_and_months():
+    daily = daily_frame(rows())
+    days = over_time(daily, "Want or Need", "Day")
+    # Eight days of needs, and the Sunday also has a want
+    assert len(days) == 9
+    months = over_time(daily, "Want or Need", "Month")
+    assert months.set_index("Want or Need")["Price"].to_dict() == {"Need": 8.0, "Want": 2.5}
+    assert set(months["Date"]) == {pd.Timestamp("2026-10-01")}
+
+
+def test_by_category_and_filters():
+    daily = daily_frame(rows())
+    assert by_category(daily).values.tolist() == [["Groceries", 8.0], ["Snacks", 2.5]]
+    assert by_category(select_daily(daily, want_need=["Want"])).values.tolist() == [["Snacks", 2.5]]
+    assert by_category(select_daily(daily, categories=["Household"])).empty
@@ -0,0 +1,57 @@
+import os
+import time
+
+from finsight.classifier import MIN_EXAMPLES, ItemClassifier, train_from_cache
+from finsight.synthetic import labelled_items
+
+ITEMS = labelled_items(MIN_EXAMPLES * 4, seed=3)
+
+
+def test_learn_is_visible_to_the_next_prediction():
+    classifier = ItemClassifier()
+    assert classifier.predict("GV WHOLE MILK 1GAL")[2] == 0.0
+    classifier.learn(ITEMS)
+    classifier.learn([("GV WHOLE MILK 1GAL", "Groceries", "Need")] * 20)
+    assert classifier.predict("GV WHOLE MILK 1GAL")[:2] == ("Groceries", "Need")
+
+
+def test_learn_waits_for_the_save_delay(tmp_path):
+    path = str(tmp_path / "classifier.npz")
+    classifier = ItemClassifier(path, save_delay=60)
+    for row in ITEMS:
+        classifier.learn([row])
+    assert not os.path.exists(path)
+
+    classifier.flush()
+    assert os.path.exists(path)
+    saved = os.path.getmtime(path)
+    classifier.flush()
+    assert os.path.getmtime(path) == saved
+
+
+def test_burst_of_updates_is_saved_once_after_the_delay(tmp_path):
+    path = str(tmp_path / "classifier.npz")
+    classifier = ItemClassifier(path, save_delay=1.0)
+    classifier.learn(ITEMS[:10])
+    classifier.learn(ITEMS[10:])
+    assert not os.path.exists(path)
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert os.path.exists(path)
+
+    loaded = ItemClassifier.load(path)
+    assert loaded.examples == classifier.examples
+    names = [name for name, _, _ in ITEMS[:20]]
+    assert loaded.predict_many(names) == classifier.predict_many(names)
+
+
+def test_train_from_cache_saves_immediately(tmp_path):
+    class Cache:
+        def labelled(self):
+            return [(*row, "model") for row in ITEMS]
+
+    path = str(tmp_path / "classifier.npz")
+    classifier = train_from_cache(ItemClassifier(path, save_delay=60), Cache())
+    assert os.path.exists(path)
+    assert classifier.examples == len(ITEMS)
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+import requests
+from google.api_core import exceptions as google_exceptions
+from mindee.error import MindeeHTTPClientError, MindeeHTTPServerError
+
+from finsight.clients import GeminiClient, MindeeClient, TokenBucket, call_with_retry, is_retryable
+from finsight.fakes import FakeMindee, FakeModel, ProviderError
+
+
+class GrpcStyleError(Exception):
+    """Raw grpc errors report their status from a ``code()`` method"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._code = type("StatusCode", (), {"name": name})()
+
+    def code(self):
+        return self._code
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+@pytest.mark.parametrize("error", [
+    ConnectionError("reset"),
+    TimeoutError("slow"),
+    OSError("network unreachable"),
+    requests.exceptions.ConnectionError("refused"),
+    requests.exceptions.ReadTimeout("read timed out"),
+    requests.exceptions.ConnectTimeout("connect timed out"),
+    http_error(503),
+    http_error(429),
+    google_exceptions.ServiceUnavailable("unavailable"),
+    google_exceptions.TooManyRequests("quota"),
+    google_exceptions.ResourceExhausted("quota"),
+    google_exceptions.DeadlineExceeded("deadline"),
+    google_exceptions.InternalServerError("oops"),
+    GrpcStyleError("UNAVAILABLE"),
+    MindeeHTTPServerError({"message": "down"}, "https://api.mindee.net", 502),
+    MindeeHTTPClientError({"message": "slow down"}, "https://api.mindee.net", 429),
+    ProviderError(503),
+], ids=lambda error: type(error).__name__)
+def test_transient_errors_are_retryable(error):
+    assert is_retryable(error)
+
+
+@pytest.mark.parametrize("error", [
+    ValueError("bad response"),
+    KeyError("document"),
+    http_error(400),
+    http_error(401),
+    google_exceptions.InvalidArgument("bad prompt"),
+    google_exceptions.PermissionDenied("bad key"),
+    GrpcStyleError("INVALID_ARGUMENT"),
+    MindeeHTTPClientError({"message": "bad key"}, "https://api.mindee.net", 401),
+], ids=lambda error: type(error).__name__)
+def test_permanent_errors_are_not_retryable(error):
+    assert not is_retryable(error)
+
+
+def failing(*errors, result="ok"):
+    errors = list(errors)
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return func, calls
+
+
+def test_call_with_retry_retries_transient_errors():
+    func, calls = failing(ProviderError(503), requests.exceptions.ConnectionError())
+    assert call_with_retry(func, attempts=3, base_delay=0.001) == "ok"
+    assert len(calls) == 3
+
+
+def test_call_with_retry_raises_permanent_errors_at_once():
+    func, calls = failing(ValueError("bad"))
+    with pytest.raises(ValueError):
+        call_with_retry(func, attempts=3, base_delay=0.001)
+    assert len(calls) == 1
+
+
+def test_call_with_retry_gives_up_after_attempts():
+    func, calls = failing(*[ProviderError(503)] * 5)
+    with pytest.raises(ProviderError):
+        call_with_retry(func, attempts=3, base_delay=0.001)
+    assert len(calls) == 3
+
+
+def test_call_with_retry_stops_at_deadline():
+    func, calls = failing(*[ProviderError(503)] * 5)
+    with pytest.raises(ProviderError):
+        call_with_retry(func, deadline=time.monotonic() + 0.05, attempts=10, base_delay=1.0, max_delay=1.0)
+    # The next backoff would end past the deadline, so it is not attempted; at worst a few tiny delays fit
+    assert len(calls) < 10
+
+
+def test_token_bucket_paces_calls():
+    bucket = TokenBucket(rate=50, capacity=1)
+    began = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - began >= 3 / 50 * 0.9
+
+
+def test_token_bucket_times_out_before_deadline():
+    bucket = TokenBucket(rate=0.1, capacity=1)
+    bucket.acquire()
+    with pytest.raises(TimeoutError):
+        bucket.acquire(deadline=time.monotonic() + 0.1)
+
+
+def test_gemini_client_timeout_is_relative_seconds():
+    model = FakeModel(error_rate=1.0, seed=0)
+    client = GeminiClient(model, requests_per_minute=6000, attempts=100)
+    began = time.monotonic()
+    with pytest.raises(ProviderError):
+        client.generate_content("hello", timeout=0.3)
+    assert time.monotonic() - began < 5
+
+
+def test_identical_calls_in_flight_are_merged():
+    model = FakeModel(responder=lambda prompt: "answer", latency=0.2)
+    client = GeminiClient(model, requests_per_minute=6000)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.generate_content("same").text))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["answer"] * 4
+    assert model.calls == 1
+    assert client.merged == 3
+
+
+def test_mindee_client_retries_with_a_fresh_source():
+    mindee = FakeMindee(error_rate=0.5, seed=3)
+    client = MindeeClient(mindee, requests_per_minute=6000, attempts=10)
+    for i in range(5):
+        source = client.source_from_bytes(f"receipt {i}".encode(), "receipt.jpg")
+        result = client.parse(type("ReceiptV5", (), {}), source, timeout=30)
+        assert len(result.document.inference.prediction.line_items) == 3
+    assert mindee.errors > 0
@@ -0,0 +1,30 @@
+from finsight.fakes import Cassette, FakeModel, RecordingModel
+
+
+def long_answer(prompt):
+    return "a line of the answer\n" * 20
+
+
+def test_recording_saves_a_stream_read_to_the_end(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette.jsonl"))
+    model = RecordingModel(FakeModel(long_answer), cassette)
+    text = "".join(chunk.text for chunk in model.generate_content("prompt", stream=True))
+    assert cassette.get("gemini", "prompt") == text == long_answer("prompt")
+    assert model.unsaved == 0
+    assert Cassette(cassette.path).get("gemini", "prompt") == text
+
+
+def test_recording_leaves_out_an_abandoned_stream(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette.jsonl"))
+    model = RecordingModel(FakeModel(long_answer), cassette)
+    stream = model.generate_content("prompt", stream=True)
+    next(stream)
+    stream.close()
+    assert cassette.get("gemini", "prompt") is None
+    assert model.unsaved == 1
+
+
+def test_recording_saves_whole_answers(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette.jsonl"))
+    model = RecordingModel(FakeModel(long_answer), cassette)
+    assert model.generate_content("prompt").text == cassette.get("gemini", "prompt")
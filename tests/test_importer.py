@@ -0,0 +1,105 @@
+import io
+
+import pandas as pd
+import pytest
+
+from finsight.importer import check_mapping, guess_date_format, import_transactions
+from finsight.storage import TransactionStore
+
+HEADER = "Transaction Date,Description,Amount\n"
+
+
+def export(*lines):
+    return io.BytesIO((HEADER + "".join(line + "\n" for line in lines)).encode())
+
+
+def stored(store):
+    return store.query().sort_values(["Date", "Name", "Price"])[["Name", "Price", "Date"]].reset_index(drop=True)
+
+
+ROWS = [
+    "01/02/2024,STARBUCKS,-4.50",
+    "01/02/2024,STARBUCKS,-4.50",
+    "01/03/2024,WHOLE FOODS MARKET,-52.10",
+    "01/03/2024,PAYMENT THANK YOU,500.00",
+    "01/04/2024,STARBUCKS,-4.50",
+    "01/04/2024,STARBUCKS,-4.50",
+    "01/04/2024,STARBUCKS,-4.50",
+    "01/05/2024,NETFLIX.COM,-15.49",
+]
+
+
+def test_fingerprints_do_not_depend_on_chunk_boundaries(tmp_path):
+    frames = []
+    for chunksize in (1, 2, 3, 1000):
+        store = TransactionStore(str(tmp_path / f"chunks-{chunksize}.db"))
+        report = import_transactions(store, export(*ROWS), "history.csv", "import", chunksize=chunksize)
+        assert (report.rows, report.imported, report.skipped, report.duplicates) == (8, 7, 1, 0)
+        fingerprints = store._conn.execute("SELECT fingerprint FROM transactions ORDER BY fingerprint").fetchall()
+        frames.append((stored(store), fingerprints))
+    for frame, fingerprints in frames[1:]:
+        pd.testing.assert_frame_equal(frame, frames[0][0])
+        assert fingerprints == frames[0][1]
+
+
+def test_repeats_with_other_rows_between_them_survive_small_chunks(tmp_path):
+    lines = ["01/02/2024,COFFEE,-3.00", "01/02/2024,BAGEL,-2.50", "01/02/2024,COFFEE,-3.00"]
+    for chunksize in (1, 50000):
+        store = TransactionStore(str(tmp_path / f"interleaved-{chunksize}.db"))
+        report = import_transactions(store, export(*lines), "history.csv", "import", chunksize=chunksize)
+        assert (report.imported, report.duplicates) == (3, 0)
+        assert (stored(store)["Name"] == "COFFEE").sum() == 2
+
+
+def test_reimport_adds_only_new_rows(store):
+    import_transactions(store, export(*ROWS[:5]), "history.csv", "first", chunksize=2)
+    report = import_transactions(store, export(*ROWS), "history.csv", "second", chunksize=3)
+    assert (report.imported, report.duplicates) == (3, 4)
+    assert store.count() == 7
+    # Genuine repeats on one day survive: two coffees on the 2nd and three on the 4th
+    assert (stored(store)["Name"] == "STARBUCKS").sum() == 5
+
+
+def test_import_rows_skips_known_fingerprints(store):
+    frame = pd.DataFrame({"Name": ["MILK", "EGGS"], "Price": [3.5, 4.0], "Date": ["2024-05-01", "2024-05-01"],
+                          "Category": ["Groceries", "Groceries"], "Want or Need": ["Need", "Need"],
+                          "Fingerprint": [1, 2]})
+    assert store.import_rows("first", frame) == 2
+    version = store.version
+    assert store.import_rows("second", frame) == 0
+    assert store.count() == 2
+    assert store.version == version
+    assert sum(total for _, _, _, total in store.daily_totals()) == pytest.approx(7.5)
+
+
+def test_date_format_is_guessed_once_for_every_chunk(store):
+    # Only the last row shows the file is day-first; a per-chunk guess would read the others month-first
+    lines = ["02/03/2024,MILK,-3.50", "04/05/2024,EGGS,-4.00", "25/12/2024,TURKEY,-30.00"]
+    assert guess_date_format(pd.Series([line.split(",")[0] for line in lines])) == "%d/%m/%Y"
+    import_transactions(store, export(*lines), "history.csv", "import", chunksize=1)
+    assert sorted(stored(store)["Date"].dt.strftime("%Y-%m-%d")) == ["2024-03-02", "2024-05-04", "2024-12-25"]
+
+
+def test_unreadable_rows_are_counted(store):
+    report = import_transactions(store, export("2024-01-02,MILK,-3.50", "yesterday,EGGS,-4.00", "2024-01-03,TEA,-"),
+                                 "history.csv", "import", date_format="%Y-%m-%d")
+    assert (report.imported, report.skipped, report.unreadable) == (1, 0, 2)
+
+
+def test_guess_date_format():
+    assert guess_date_format(pd.Series(["2024-01-31", "2024-02-01"])) == "%Y-%m-%d"
+    assert guess_date_format(pd.Series(["01/31/2024", None, ""])) == "%m/%d/%Y"
+    assert guess_date_format(pd.Series(["20240131"])) == "%Y%m%d"
+    assert guess_date_format(pd.Series(["soon"])) is None
+    assert guess_date_format(pd.Series([], dtype=object)) is None
+
+
+def test_duplicate_column_mapping_is_rejected(store):
+    mapping = {"Name": "Description", "Price": "Amount", "Date": "Transaction Date", "Category": "Description"}
+    with pytest.raises(ValueError, match="'Description' \\(Name and Category\\)"):
+        check_mapping(mapping)
+    with pytest.raises(ValueError, match="only be used once"):
+        import_transactions(store, export(*ROWS), "history.csv", "import", mapping=mapping)
+    assert store.count() == 0
+    with pytest.raises(ValueError, match="Date"):
+        check_mapping({"Name": "Description", "Price": "Amount", "Date": None})
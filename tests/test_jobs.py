@@ -0,0 +1,153 @@
+import io
+import time
+
+import pytest
+from PIL import Image
+
+from finsight.clients import MindeeClient
+from finsight.fakes import FakeMindee, FakeModel, ProviderError
+from finsight.jobs import ACTIVE, DONE, FAILED, JobQueue
+from finsight.pipeline import ReceiptPipeline, ReceiptResult, image_key
+
+
+class ScriptedPipeline:
+    """Stands in for ReceiptPipeline, answering each call with the next outcome in ``outcomes``"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def process(self, image_bytes, filename, report=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        result = ReceiptResult(key=image_key(image_bytes), filename=filename)
+        if outcome == "ok":
+            result.items = [{"Name": "MILK", "Price": 3.5, "Date": "2024-05-01",
+                             "Category": "Groceries", "Want or Need": "Need"}]
+        else:
+            result.error, result.retryable = outcome, outcome == "transient"
+        return result
+
+
+class RejectingMindee(FakeMindee):
+    """FakeMindee whose every parse fails with ``status_code``"""
+
+    def __init__(self, status_code):
+        super().__init__()
+        self.status_code = status_code
+
+    def parse(self, product_class, input_source):
+        self._faults.call()
+        raise ProviderError(self.status_code)
+
+
+def receipt_image():
+    buffer = io.BytesIO()
+    Image.new("L", (200, 300), 255).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def make_queue(tmp_path, store):
+    queues = []
+
+    def make(pipeline, **options):
+        options.setdefault("workers", 1)
+        options.setdefault("retry_delay", 0.01)
+        queue = JobQueue(str(tmp_path / "jobs.db"), pipeline, store, **options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def wait(queue, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = queue.jobs([job_id])[job_id]
+        if job.status not in ACTIVE or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_finished_job_stores_its_items(make_queue, store):
+    queue = make_queue(ScriptedPipeline("ok"))
+    job = wait(queue, queue.submit(b"receipt", "receipt.jpg"))
+    assert job.status == DONE
+    assert job.summary["items"] == 1
+    assert store.has_batch(job.id)
+    assert store.count() == 1
+
+
+def test_transient_failures_are_retried(make_queue):
+    pipeline = ScriptedPipeline("transient", "transient", "ok")
+    queue = make_queue(pipeline, max_attempts=3)
+    job = wait(queue, queue.submit(b"receipt", "receipt.jpg"))
+    assert (job.status, job.attempts, pipeline.calls) == (DONE, 3, 3)
+
+
+def test_gives_up_after_max_attempts(make_queue):
+    pipeline = ScriptedPipeline("transient", "transient", "transient", "ok")
+    queue = make_queue(pipeline, max_attempts=2)
+    job = wait(queue, queue.submit(b"receipt", "receipt.jpg"))
+    assert (job.status, job.attempts, pipeline.calls) == (FAILED, 2, 2)
+
+
+def test_permanent_failure_is_not_retried(make_queue):
+    pipeline = ScriptedPipeline("No items found")
+    queue = make_queue(pipeline)
+    job = wait(queue, queue.submit(b"receipt", "receipt.jpg"))
+    assert (job.status, job.error, pipeline.calls) == (FAILED, "No items found", 1)
+
+
+def test_resubmitting_never_reprocesses(make_queue):
+    pipeline = ScriptedPipeline("No items found")
+    queue = make_queue(pipeline)
+    job_id = queue.submit(b"receipt", "receipt.jpg")
+    wait(queue, job_id)
+    # A receipt still sitting in the upload widget is submitted again on every rerun
+    for _ in range(3):
+        assert queue.submit(b"receipt", "receipt.jpg") == job_id
+    time.sleep(0.1)
+    assert queue.jobs([job_id])[job_id].status == FAILED
+    assert pipeline.calls == 1
+
+
+def test_retry_requeues_only_failed_jobs(make_queue):
+    pipeline = ScriptedPipeline("No items found", "ok")
+    queue = make_queue(pipeline)
+    job_id = queue.submit(b"receipt", "receipt.jpg")
+    assert wait(queue, job_id).status == FAILED
+    assert queue.retry(job_id)
+    job = wait(queue, job_id)
+    assert (job.status, job.attempts, pipeline.calls) == (DONE, 1, 2)
+    assert not queue.retry(job_id)
+
+
+def test_interrupted_jobs_resume_after_restart(make_queue):
+    queue = make_queue(ScriptedPipeline())
+    queue.close()
+    time.sleep(0.6)
+    job_id = queue.submit(b"receipt", "receipt.jpg")
+    # Simulate a crash mid-OCR
+    queue._set(job_id, status="ocr")
+    job = wait(make_queue(ScriptedPipeline("ok")), job_id)
+    assert job.status == DONE
+
+
+def test_real_pipeline_fails_rejected_requests_on_the_first_attempt(make_queue):
+    mindee = RejectingMindee(401)
+    pipeline = ReceiptPipeline(MindeeClient(mindee, requests_per_minute=6000), FakeModel())
+    queue = make_queue(pipeline, max_attempts=3)
+    job = wait(queue, queue.submit(receipt_image(), "receipt.png"))
+    assert (job.status, job.attempts, mindee.calls) == (FAILED, 1, 1)
+    assert "401" in job.error
+
+
+def test_real_pipeline_retries_provider_overload(make_queue):
+    mindee = RejectingMindee(503)
+    queue = make_queue(ReceiptPipeline(mindee, FakeModel()), max_attempts=2)
+    job = wait(queue, queue.submit(receipt_image(), "receipt.png"))
+    assert (job.status, job.attempts, mindee.calls) == (FAILED, 2, 2)
@@ -0,0 +1,118 @@
+import io
+import threading
+
+from PIL import Image
+
+from finsight.cache import ResultCache
+from finsight.fakes import FakeMindee, FakeModel, ProviderError
+from finsight.pipeline import STAGES, ReceiptPipeline
+
+
+class InFlight:
+    """Counts the calls running at once and remembers the most seen"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.current -= 1
+
+
+class CountingMindee(FakeMindee):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.in_flight = InFlight()
+
+    def parse(self, product_class, input_source):
+        with self.in_flight:
+            return super().parse(product_class, input_source)
+
+
+class CountingModel(FakeModel):
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.in_flight = InFlight()
+
+    def generate_content(self, prompt, stream=False):
+        with self.in_flight:
+            return super().generate_content(prompt, stream=stream)
+
+
+class FailingFirstMindee(FakeMindee):
+    """FakeMindee whose first parse fails with a provider error"""
+
+    def __init__(self):
+        super().__init__()
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def parse(self, product_class, input_source):
+        with self._lock:
+            fail, self._failed = not self._failed, True
+        if fail:
+            raise ProviderError(503)
+        return super().parse(product_class, input_source)
+
+
+def receipt_images(count):
+    """Distinct blank receipt images"""
+    images = []
+    for i in range(count):
+        buffer = io.BytesIO()
+        Image.new("L", (200, 300 + i), 255).save(buffer, "PNG")
+        images.append((buffer.getvalue(), f"receipt-{i}.png"))
+    return images
+
+
+def test_provider_calls_stay_within_their_limits():
+    mindee, model = CountingMindee(latency=0.05), CountingModel(latency=0.05)
+    pipeline = ReceiptPipeline(mindee, model, max_workers=6, ocr_concurrency=2, llm_concurrency=1)
+    events = list(pipeline.process_many(receipt_images(6)))
+
+    assert (mindee.calls, model.calls) == (6, 6)
+    assert (mindee.in_flight.peak, model.in_flight.peak) == (2, 1)
+    for key in {event.key for event in events}:
+        assert [event.stage for event in events if event.key == key] == STAGES
+
+
+def test_ingest_cache_hit_skips_the_providers(tmp_path):
+    cache = ResultCache(str(tmp_path / "receipts.db"))
+    (image, filename), = receipt_images(1)
+    first = ReceiptPipeline(FakeMindee(), FakeModel(), ingest_cache=cache).process(image, filename)
+    assert first.error is None and not first.cached
+
+    mindee, model = FakeMindee(), FakeModel()
+    stages = []
+    again = ReceiptPipeline(mindee, model, ingest_cache=cache).process(image, filename, stages.append)
+    assert again.cached
+    assert (mindee.calls, model.calls, stages) == (0, 0, [])
+    assert again.items == first.items
+
+
+def test_receipt_without_items_is_an_error():
+    model = FakeModel()
+    (image, filename), = receipt_images(1)
+    result = ReceiptPipeline(FakeMindee(items=()), model).process(image, filename)
+    assert result.error.startswith("No items found")
+    assert not result.retryable
+    assert result.items is None
+    assert model.calls == 0
+
+
+def test_one_failed_receipt_does_not_stop_the_others():
+    pipeline = ReceiptPipeline(FailingFirstMindee(), FakeModel(), max_workers=4)
+    results = [event.result for event in pipeline.process_many(receipt_images(5)) if event.result is not None]
+
+    failed = [result for result in results if result.error]
+    assert len(results) == 5
+    assert len(failed) == 1
+    assert failed[0].retryable
+    assert all(len(result.items) == 3 for result in results if not result.error)
@@ -0,0 +1,106 @@
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from finsight.rules import DEFAULT_CATEGORY, KeywordMatcher, load_rules
+from finsight.synthetic import labelled_items
+
+# Overlapping keywords of both kinds: prefixes of each other, the same keyword
+# as a word and a substring, words inside substrings and the other way round
+CUSTOM_RULES = [
+    {"keyword": "tea", "category": "Snacks", "priority": 2, "match": "word"},
+    {"keyword": "tea bag", "category": "Groceries", "priority": 1},
+    {"keyword": "te", "category": "Household", "priority": 3},
+    {"keyword": "tea", "category": "Other", "priority": 4},
+    {"keyword": "steak", "category": "Groceries", "priority": 3, "match": "word"},
+    {"keyword": "ak", "category": "Subscriptions", "priority": 2},
+    {"keyword": "ice", "category": "Household", "priority": 5, "match": "word"},
+    {"keyword": "ice cream", "category": "Snacks", "priority": 1, "match": "word"},
+    {"keyword": "ice-", "category": "Groceries", "priority": 0, "match": "word"},
+    {"keyword": "cream", "category": "Groceries", "priority": 2},
+    {"keyword": "prime", "category": "Subscriptions", "priority": 1, "match": "word"},
+    {"keyword": "primer", "category": "Household", "priority": 0},
+    {"keyword": "milk", "category": "Groceries", "priority": 1},
+    {"keyword": "milkshake", "category": "Snacks", "priority": 1, "match": "word"},
+]
+
+
+def previous_categorize_by_keywords(item_name):
+    """categorize_by_keywords as it was before the rule table, kept as the reference"""
+    item_lower = item_name.lower()
+    grocery_keywords = ["food", "grocery", "market", "produce", "meat", "dairy", "vegetable", "fruit", "bread", "milk",
+                        "eggs"]
+    if any(keyword in item_lower for keyword in grocery_keywords):
+        return "Groceries"
+    snack_keywords = ["snack", "candy", "chocolate", "chip", "soda", "drink", "beverage", "coffee", "tea"]
+    if any(keyword in item_lower for keyword in snack_keywords):
+        return "Snacks"
+    household_keywords = ["clean", "soap", "detergent", "paper", "towel", "shampoo", "toilet", "bath", "kitchen"]
+    if any(keyword in item_lower for keyword in household_keywords):
+        return "Household"
+    subscription_keywords = ["netflix", "spotify", "prime", "subscription", "membership", "streaming"]
+    if any(keyword in item_lower for keyword in subscription_keywords):
+        return "Subscriptions"
+    return "Other"
+
+
+def sequential(rules, name):
+    """Category of the first matching rule, trying rules in priority then table order"""
+    name = name.lower()
+    for rule in sorted(rules, key=lambda rule: rule.get("priority", 0)):
+        keyword = rule["keyword"].lower()
+        if rule.get("match", "substring") == "word":
+            if re.search(rf"\b{re.escape(keyword)}\b", name):
+                return rule["category"]
+        elif keyword in name:
+            return rule["category"]
+    return DEFAULT_CATEGORY
+
+
+def names_for(rules, count=3000, seed=0):
+    """Receipt-like names packed with the rules' keywords, whole, cut short and run together"""
+    rng = random.Random(seed)
+    keywords = [rule["keyword"] for rule in rules]
+    names = [name for name, _, _ in labelled_items(count // 3, seed)]
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 3)):
+            keyword = rng.choice(keywords)
+            parts.append(rng.choice([keyword, keyword[:-1], keyword + "s", "s" + keyword, keyword.upper()]))
+        names.append("".join(part + rng.choice([" ", "", "-", "2 ", " 12oz "]) for part in parts).strip())
+    return names
+
+
+@pytest.mark.parametrize("rules", [load_rules(), CUSTOM_RULES], ids=["shipped", "custom"])
+def test_matcher_agrees_with_sequential_scan(rules):
+    matcher = KeywordMatcher(rules)
+    names = names_for(rules)
+    expected = [sequential(rules, name) for name in names]
+    assert [matcher.match(name) for name in names] == expected
+    assert matcher.match_series(pd.Series(names)).tolist() == expected
+
+
+def test_shipped_table_as_substrings_matches_previous_categorize_by_keywords():
+    # The table made "tea" and "prime" whole words on purpose; as substrings it is the old function
+    rules = [{**rule, "match": "substring"} for rule in load_rules()]
+    matcher = KeywordMatcher(rules)
+    names = names_for(rules, seed=1) + ["STEAK", "PRIMER PAINT", "TEA", "PRIME VIDEO"]
+    assert [matcher.match(name) for name in names] == [previous_categorize_by_keywords(name) for name in names]
+
+
+def test_whole_words():
+    matcher = KeywordMatcher(load_rules())
+    assert matcher.match("STEAK") == DEFAULT_CATEGORY
+    assert matcher.match("GREEN TEA") == "Snacks"
+    assert matcher.match("PRIMER PAINT") == DEFAULT_CATEGORY
+    assert matcher.match("AMAZON PRIME") == "Subscriptions"
+
+
+def test_match_series_keeps_index_and_handles_missing_names():
+    matcher = KeywordMatcher(load_rules())
+    names = pd.Series(["WHOLE MILK", None, "NETFLIX"], index=[10, 20, 30])
+    result = matcher.match_series(names)
+    assert result.tolist() == ["Groceries", DEFAULT_CATEGORY, "Subscriptions"]
+    assert result.index.tolist() == [10, 20, 30]
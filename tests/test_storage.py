@@ -0,0 +1,69 @@
+from datetime import date
+
+from finsight.storage import TransactionStore
+
+
+def item(name="MILK", price=3.5, day=date(2024, 5, 1), category="Groceries", want_need="Need"):
+    return {"Name": name, "Price": price, "Date": day, "Category": category, "Want or Need": want_need}
+
+
+def test_append_batch_stores_items_once(store):
+    assert store.append_batch("receipt-1", [item(), item("CHIPS", 2.0, category="Snacks", want_need="Want")])
+    assert not store.append_batch("receipt-1", [item()])
+    assert store.count() == 2
+    assert store.batch_count() == 1
+    assert store.has_batch("receipt-1")
+
+
+def test_every_write_bumps_version(store):
+    versions = [store.version]
+    store.append_batch("receipt-1", [item()])
+    versions.append(store.version)
+    store.add_rows("manual", [item("EGGS")])
+    versions.append(store.version)
+    row_id = store.query().index[0]
+    store.update_rows({row_id: {"Price": 9.0}})
+    versions.append(store.version)
+    store.delete_rows([row_id])
+    versions.append(store.version)
+    assert versions == sorted(set(versions))
+
+
+def test_skipped_writes_keep_version(store):
+    store.append_batch("receipt-1", [item()])
+    version = store.version
+    store.append_batch("receipt-1", [item()])
+    store.add_rows("manual", [])
+    store.update_rows({})
+    store.delete_rows([])
+    assert store.version == version
+
+
+def test_query_is_typed_and_newest_first(store):
+    store.append_batch("receipt-1", [item(day=date(2024, 1, 1)), item("TEA", 4.0, date(2024, 3, 1), "Snacks", "Want")])
+    df = store.query()
+    assert list(df["Name"]) == ["TEA", "MILK"]
+    assert str(df["Date"].dtype).startswith("datetime64")
+    assert df["Price"].dtype == float
+    assert df["Category"].dtype == "category"
+
+
+def test_query_filters(store):
+    store.append_batch("receipt-1", [item(day=date(2024, 1, 1)), item("TEA", 4.0, date(2024, 3, 1), "Snacks", "Want")])
+    assert list(store.query(start=date(2024, 2, 1))["Name"]) == ["TEA"]
+    assert list(store.query(end=date(2024, 2, 1))["Name"]) == ["MILK"]
+    assert list(store.query(categories=["Snacks"])["Name"]) == ["TEA"]
+    assert list(store.query(want_need=["Need"])["Name"]) == ["MILK"]
+    assert store.query(batch_id="missing").empty
+
+
+def test_invalid_values_are_cleaned(store):
+    store.append_batch("receipt-1", [item(name=None, price="n/a", category="Toys", want_need="Maybe")])
+    row = store.query().iloc[0]
+    assert (row["Name"], row["Price"], row["Category"], row["Want or Need"]) == ("", 0.0, "Other", "Need")
+
+
+def test_rows_survive_reopening(tmp_path):
+    path = str(tmp_path / "finsight.db")
+    TransactionStore(path).append_batch("receipt-1", [item()])
+    assert TransactionStore(path).count() == 1
@@ -0,0 +1,19 @@
+import pytest
+
+from finsight.synthetic import seed_store
+
+
+def test_seed_store_adds_every_row_on_each_call(store):
+    seed_store(store, 500)
+    seed_store(store, 300, seed=1)
+    frame = seed_store(store, 200, batch_id="more")
+    assert store.count() == 1000
+    assert len(frame) == 200
+
+
+def test_seed_store_fails_loudly_when_rows_are_skipped(store):
+    seed_store(store, 500)
+    store.delete_rows(store.query().index[:100].tolist())
+    # Numbering on from 400 rows reuses fingerprints still stored
+    with pytest.raises(RuntimeError, match="of 200 synthetic rows were stored"):
+        seed_store(store, 200)
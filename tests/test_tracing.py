@@ -0,0 +1,66 @@
+import contextvars
+import threading
+
+import pytest
+
+from finsight import tracing
+
+
+@pytest.fixture(autouse=True)
+def tracing_off(monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", False)
+    tracing.end_rerun()
+    yield
+    tracing.end_rerun()
+
+
+def test_spans_are_no_ops_unless_captured():
+    assert tracing.span("idle") is tracing._NULL
+    rerun = tracing.start_rerun()
+    with tracing.span("work", rows=3):
+        with tracing.span("inner"):
+            pass
+    assert tracing.end_rerun() is rerun
+    assert [(span.name, span.depth) for span in rerun.spans] == [("inner", 1), ("work", 0)]
+    assert rerun.spans[1].attrs == {"rows": 3}
+    assert tracing.span("idle") is tracing._NULL
+
+
+def test_capture_stays_in_its_own_context():
+    seen = {}
+
+    def other_session():
+        seen["span"] = tracing.span("other")
+
+    tracing.start_rerun()
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    thread.join()
+    assert seen["span"] is tracing._NULL
+
+    seen["span"] = contextvars.Context().run(tracing.span, "other")
+    assert seen["span"] is tracing._NULL
+    assert tracing.span("mine") is not tracing._NULL
+
+
+def test_start_rerun_replaces_an_unfinished_capture():
+    stale = tracing.start_rerun()
+    with tracing.span("interrupted"):
+        pass
+    # The previous run stopped (st.rerun, st.stop or an exception) before end_rerun
+    fresh = tracing.start_rerun()
+    with tracing.span("next"):
+        pass
+    assert tracing.end_rerun() is fresh
+    assert [span.name for span in fresh.spans] == ["next"]
+    assert [span.name for span in stale.spans] == ["interrupted"]
+    assert tracing.end_rerun() is None
+
+
+def test_counters_follow_the_same_gate():
+    before = tracing.snapshot()["counters"].get("test.count", 0)
+    tracing.count("test.count")
+    tracing.start_rerun()
+    tracing.count("test.count", 2)
+    tracing.end_rerun()
+    assert tracing.snapshot()["counters"].get("test.count", 0) == before + 2